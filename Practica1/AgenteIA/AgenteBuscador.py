@@ -1,6 +1,14 @@
 import time
 import heapq
+import itertools
+import os
+import sys
+from collections import deque
 from AgenteIA.Agente import Agente
+from AgenteIA.Nodo import Nodo, NodoAcotado
+from AgenteIA.Estadisticas import Estadisticas
+from AgenteIA.ListaAbierta import LISTAS_ABIERTAS
+from AgenteIA.Paralelo import busqueda_hda
 
 class AgenteBuscador(Agente):
     def __init__(self):
@@ -8,11 +16,40 @@ class AgenteBuscador(Agente):
         self.estado_inicial = None
         self.estado_meta = None
         self.funcion_sucesor = []  # lista de callables: succ(nodo) -> list[str] | str | None
-        self.tecnica = None        # 'anchura'|'profundidad'|'costouniforme'|'codicioso'|'astar'
+        self.tecnica = None        # 'anchura'|'profundidad'|'costouniforme'|'codicioso'|'astar'|'idastar'
+                                   # |'bidireccional'|'mm'|'smastar'|'ponderado'|'ara'|'iddfs'
+                                   # |'lrta'|'rta' (tiempo real: un movimiento por llamada)
+                                   # |'hda' (A* paralelo en varios procesos)
+        self.lista_abierta = 'heap'  # frontera de la busqueda mejor-primero: 'heap'|'heap_g'|'cubetas'
+        self.max_nodos = None        # presupuesto de 'smastar' en nodos...
+        self.max_bytes = None        # ...o en bytes (estimados por nodo)
+        self.peso = 2.0              # w de 'ponderado' (f = g + w*h) y w inicial de 'ara'
+        self.paso_peso = 0.5         # cuanto baja w entre pasadas de 'ara'
+        self.limite_tiempo = None    # segundos para 'ara' (None = hasta probar la optimalidad)
+        self.limite_profundidad = None  # profundidad maxima de 'profundidad' e 'iddfs'
+        self.presupuesto_ms = 10.0   # tiempo de planificacion por movimiento en 'lrta'/'rta'
+        self.h_aprendida = {}        # estado -> h aprendido; se conserva entre llamadas
+        self.latencias_ms = []       # planificacion de cada movimiento en tiempo real
+        self.trabajadores = None     # procesos de 'hda' (None = uno por CPU)
+        self.lote = 64               # hijos por envio entre trabajadores de 'hda'
+        self.al_expandir = []        # funciones fun(estado, estadisticas) por expansion
+        self.estadisticas = Estadisticas()
+        self._cancelar = False
 
     def add_funcion_sucesor(self, fun):
         self.funcion_sucesor.append(fun)
 
+    def add_al_expandir(self, fun):
+        self.al_expandir.append(fun)
+
+    def cancelar(self):
+        """Pide detener la busqueda en curso (p. ej. desde otro hilo).
+
+        programa() termina lanzando BusquedaCancelada en la siguiente expansion.
+        """
+        self._cancelar = True
+        self.estadisticas.cancelada = True
+
     def get_hijos(self, nodo):
         """Acepta funciones sucesor que devuelven un hijo, lista de hijos o None."""
         hijos = []
@@ -43,74 +80,788 @@ class AgenteBuscador(Agente):
         """Debe retornar h(nodo) (no de todo el camino)."""
         raise Exception("Error: No existe implementacion de get_heuristica(nodo)")
 
+    def get_heuristica_inversa(self, nodo):
+        """h hacia estado_inicial, para la busqueda bidireccional 'mm' (0 si no se redefine)."""
+        return 0
+
+    def get_atajo(self, nodo):
+        """Ruta optima ya conocida de `nodo` a la meta, o None (por defecto, ninguna).
+
+        Solo se usa en 'astar' y 'codicioso', donde h(nodo) debe ser entonces
+        la distancia exacta para que la ruta completa siga siendo optima.
+        """
+        return None
+
+    def get_estado_actual(self):
+        """Estado desde el que decide la busqueda en tiempo real: la percepcion, o el inicial."""
+        return self.estado_inicial if self.percepcion is None else self.percepcion
+
+    def get_predecesores(self, nodo):
+        """Estados desde los que se llega a `nodo`; por defecto, acciones reversibles."""
+        return self.get_hijos(nodo)
+
     def test_objetivo(self, e):
         return e == self.estado_meta
 
+    def get_costo_paso(self, estado, hijo):
+        """Costo de la arista estado -> hijo (por defecto, costo unitario)."""
+        return 1
+
+    def get_medida_rendimiento(self):
+        """Metricas de la ultima busqueda mas los contadores de `estadisticas`."""
+        m = dict(getattr(self, "_medida_rendimiento", {}))
+        m.update(self.estadisticas.como_dict())
+        return m
+
+    def _sucesores_medidos(self, estado, sucesores=None):
+        est = self.estadisticas
+        hijos = est.medir("t_sucesores", sucesores or self.get_hijos, estado)
+        est.generados += len(hijos)
+        return hijos
+
+    def _h_medida(self, estado, heuristica=None):
+        return self.estadisticas.medir("t_heuristica", heuristica or self.get_heuristica, estado)
+
+    def _h_nodo(self, nodo):
+        """h del nodo: la que trae de _expandir o, si no trae, la de get_heuristica."""
+        if nodo.h is None:
+            nodo.h = self._h_medida(nodo.estado)
+        return nodo.h
+
+    def _nueva_busqueda(self):
+        self._medida_rendimiento = {}
+        self.estadisticas = Estadisticas(self.al_expandir)
+        self.estadisticas.cancelada = self._cancelar  # cancelar() antes de empezar
+
     def programa(self):
-        # Soporte BFS/DFS y ordenamientos por clave externa
-        if self.tecnica in ('anchura', 'profundidad'):
-            frontera = [[self.estado_inicial]]
-            visitados = set([self.estado_inicial])
-            while frontera:
-                camino = frontera.pop() if self.tecnica == 'profundidad' else frontera.pop(0)
-                nodo = camino[-1]
-
-                if self.test_objetivo(nodo):
-                    self.acciones = camino
-                    break
+        self._nueva_busqueda()
+        try:
+            if self.tecnica in ('anchura', 'profundidad'):
+                self._busqueda_no_informada()
+            elif self.tecnica in ('costouniforme', 'codicioso', 'astar', 'ponderado'):
+                self._busqueda_mejor_primero()
+            elif self.tecnica == 'ara':
+                for _ in self._busqueda_ara(self.limite_tiempo):
+                    pass
+                self._medida_rendimiento["operaciones"] = self.estadisticas.expandidos
+            elif self.tecnica == 'idastar':
+                self._busqueda_idastar()
+            elif self.tecnica == 'iddfs':
+                self._busqueda_iddfs()
+            elif self.tecnica in ('lrta', 'rta'):
+                self._paso_tiempo_real()
+            elif self.tecnica == 'bidireccional':
+                self._busqueda_bidireccional()
+            elif self.tecnica == 'mm':
+                self._busqueda_mm()
+            elif self.tecnica == 'smastar':
+                self._busqueda_smastar()
+            elif self.tecnica == 'hda':
+                self._busqueda_hda()
+            else:
+                raise ValueError(f"Técnica no soportada: {self.tecnica}")
+        finally:
+            self._cancelar = False
 
-                for hijo in self.get_hijos(nodo):
-                    if hijo in visitados:
-                        continue
-                    if hijo in camino:   # evita ciclos en el mismo camino
+    def _expandir(self, nodo):
+        """Genera los nodos hijo de `nodo` (sin copiar caminos)."""
+        self.estadisticas.expandido(nodo.estado)
+        hijos = []
+        for accion, hijo in enumerate(self._sucesores_medidos(nodo.estado)):
+            g = nodo.g + self.get_costo_paso(nodo.estado, hijo)
+            hijos.append(Nodo(hijo, g, nodo, accion))
+        return hijos
+
+    def _busqueda_no_informada(self):
+        if self.tecnica == 'profundidad':
+            self._busqueda_profundidad()
+        else:
+            self._busqueda_anchura()
+
+    def _busqueda_anchura(self):
+        # BFS por capas sobre una deque; `visitados` indexa por estado y
+        # `capas` guarda el tamano de cada capa de la frontera
+        est = self.estadisticas
+        frontera = deque([Nodo(self.estado_inicial)])
+        visitados = {self.estado_inicial}
+        capas = []
+        while frontera:
+            capas.append(len(frontera))
+            for _ in range(len(frontera)):
+                t0 = time.perf_counter()
+                nodo = frontera.popleft()
+                est.t_cola += time.perf_counter() - t0
+
+                if self.test_objetivo(nodo.estado):
+                    self.acciones = nodo.camino()
+                    self._medida_rendimiento["capas"] = capas
+                    return
+
+                for hijo in self._expandir(nodo):
+                    if hijo.estado in visitados:
+                        est.duplicados += 1
                         continue
-                    visitados.add(hijo)
-                    nuevo = camino + [hijo]
-                    frontera.append(nuevo)
-
-        elif self.tecnica in ('costouniforme', 'codicioso', 'astar'):
-            # Usamos una priority queue sobre caminos completos
-            # clave:
-            #  - UCS: f = g(camino)
-            #  - Greedy: f = h(ultimo)
-            #  - A*: f = g(camino) + h(ultimo)
-            def clave(camino):
-                ultimo = camino[-1]
-                if self.tecnica == 'costouniforme':
-                    return self.get_costo(camino)
-                elif self.tecnica == 'codicioso':
-                    return self.get_heuristica(ultimo)
-                else:  # 'astar'
-                    return self.get_costo(camino) + self.get_heuristica(ultimo)
-
-            pq = []
-            heapq.heappush(pq, (0, [self.estado_inicial]))
-            # Para evitar reexpandir estados con peor g, llevamos best_g por nodo (A*/UCS)
-            best_g = {self.estado_inicial: 0}
+                    visitados.add(hijo.estado)
+                    frontera.append(hijo)
+                est.frontera(len(frontera), len(visitados))
+        self._medida_rendimiento["capas"] = capas
 
-            while pq:
-                _, camino = heapq.heappop(pq)
-                nodo = camino[-1]
+    def _busqueda_profundidad(self):
+        # DFS con pila; con limite_profundidad no se expanden los nodos del
+        # limite y un estado se vuelve a abrir si aparece menos profundo (si
+        # no, una primera visita profunda ocultaria soluciones dentro del limite)
+        est = self.estadisticas
+        limite = self.limite_profundidad
+        frontera = [Nodo(self.estado_inicial)]
+        visitados = {self.estado_inicial: 0}  # estado -> menor profundidad vista
+        cortados = 0
+        while frontera:
+            t0 = time.perf_counter()
+            nodo = frontera.pop()
+            est.t_cola += time.perf_counter() - t0
 
-                if self.test_objetivo(nodo):
-                    self.acciones = camino
-                    break
+            if self.test_objetivo(nodo.estado):
+                self.acciones = nodo.camino()
+                break
+            if limite is not None and nodo.profundidad >= limite:
+                cortados += 1
+                continue
+
+            for hijo in self._expandir(nodo):
+                previa = visitados.get(hijo.estado)
+                if previa is not None and (limite is None or previa <= hijo.profundidad):
+                    est.duplicados += 1
+                    continue
+                if previa is not None:
+                    est.reabiertos += 1
+                visitados[hijo.estado] = hijo.profundidad
+                frontera.append(hijo)
+            est.frontera(len(frontera), len(visitados))
+        if limite is not None:
+            self._medida_rendimiento.update(limite_profundidad=limite, cortados=cortados)
+
+    def _clave(self, nodo):
+        #  - UCS: f = g
+        #  - Greedy: f = h
+        #  - A*: f = g + h
+        #  - A* ponderado: f = g + w*h (costo <= w * optimo si h es admisible)
+        if self.tecnica == 'costouniforme':
+            return nodo.g
+        elif self.tecnica == 'codicioso':
+            return self._h_nodo(nodo)
+        elif self.tecnica == 'ponderado':
+            return nodo.g + self.peso * self._h_nodo(nodo)
+        return nodo.g + self._h_nodo(nodo)
+
+    def _busqueda_mejor_primero(self):
+        if self.lista_abierta not in LISTAS_ABIERTAS:
+            raise ValueError(f"Lista abierta no soportada: {self.lista_abierta}")
+        est = self.estadisticas
+        reloj = time.perf_counter
+        raiz = Nodo(self.estado_inicial)
+        abiertos = LISTAS_ABIERTAS[self.lista_abierta]()
+        abiertos.push(raiz, self._clave(raiz))
+        # Indice abierto/cerrado por estado -> mejor nodo conocido
+        mejor = {self.estado_inicial: raiz}
+        cerrados = set()
+
+        while len(abiertos):
+            t0 = reloj()
+            nodo = abiertos.pop()
+            est.t_cola += reloj() - t0
+            if mejor[nodo.estado] is not nodo:
+                continue  # entrada obsoleta (se encontro un g mejor)
 
-                g_actual = self.get_costo(camino)
+            if self.test_objetivo(nodo.estado):
+                self.acciones = nodo.camino()
+                self._medida_rendimiento.update(pasos=len(self.acciones) - 1, costo=nodo.g)
+                break
+            cola = self.get_atajo(nodo.estado) if self.tecnica != 'costouniforme' else None
+            if cola is not None:
+                self.acciones = nodo.camino() + cola[1:]
+                costo = nodo.g + sum(self.get_costo_paso(a, b) for a, b in zip(cola, cola[1:]))
+                self._medida_rendimiento.update(pasos=len(self.acciones) - 1, costo=costo, atajo=True)
+                break
 
-                for hijo in self.get_hijos(nodo):
-                    if hijo in camino:  # evita ciclos
+            cerrados.add(nodo.estado)
+            for hijo in self._expandir(nodo):
+                previo = mejor.get(hijo.estado)
+                if previo is not None and (self.tecnica == 'codicioso' or hijo.g >= previo.g):
+                    est.duplicados += 1
+                    continue
+                # Nuevo, o relaxation estilo Dijkstra/A*: solo si mejora g
+                if previo is not None and hijo.estado in cerrados:
+                    est.reabiertos += 1
+                mejor[hijo.estado] = hijo
+                f = self._clave(hijo)
+                t0 = reloj()
+                abiertos.push(hijo, f)
+                est.t_cola += reloj() - t0
+            est.frontera(abiertos.pico, len(cerrados))
+
+        est.frontera(abiertos.pico, len(cerrados))
+        # operaciones: estados distintos expandidos (un reabierto no cuenta dos veces)
+        self._medida_rendimiento.update(lista_abierta=abiertos.nombre, pico_abiertos=abiertos.pico,
+                                        operaciones=len(cerrados))
+
+    def soluciones(self, limite_tiempo=None):
+        """ARA* como generador: entrega cada ruta mejorada apenas se encuentra.
+
+        Cada elemento es un dict con acciones, costo, peso (w de la pasada),
+        cota (costo <= cota * optimo), expandidos y tiempo_s. El llamador
+        puede dejar de iterar cuando quiera (p. ej. al vencer su plazo);
+        get_acciones() queda con la ultima ruta entregada.
+        """
+        self._nueva_busqueda()
+        try:
+            yield from self._busqueda_ara(limite_tiempo)
+        finally:
+            self._cancelar = False
+            # las mismas expansiones que se entregan con cada ruta
+            self._medida_rendimiento["operaciones"] = self.estadisticas.expandidos
+
+    def _busqueda_ara(self, limite_tiempo=None):
+        # ARA* (Likhachev, Gordon y Thrun, 2003): pasadas de A* ponderado con
+        # w decreciente que reutilizan g, la frontera y los punteros al padre
+        # de la pasada anterior. Un estado ya expandido en la pasada actual
+        # que mejora su g no se reabre: va a INCONS y vuelve a la frontera al
+        # empezar la siguiente pasada.
+        est = self.estadisticas
+        reloj = time.perf_counter
+        inicio = reloj()
+        fin = None if limite_tiempo is None else inicio + limite_tiempo
+        hs = {}
+
+        def h(estado):
+            v = hs.get(estado)
+            if v is None:
+                v = hs[estado] = self._h_medida(estado)
+            return v
+
+        raiz = Nodo(self.estado_inicial)
+        mejor = {raiz.estado: raiz}
+        abiertos = {raiz.estado: raiz}  # frontera valida: estado -> nodo
+        incons = {}
+        meta = raiz if self.test_objetivo(raiz.estado) else None
+        peso = max(1.0, self.peso)
+        contador = itertools.count()  # desempate: mas profundo primero, luego FIFO
+        entregada = None  # (costo, cota) de la ultima ruta entregada
+        historial = []
+
+        while True:
+            t0 = reloj()
+            pq = [(n.g + peso * h(e), -n.g, next(contador), n) for e, n in abiertos.items()]
+            heapq.heapify(pq)
+            est.t_cola += reloj() - t0
+            cerrados = set()
+            while pq:
+                if fin is not None and reloj() >= fin:
+                    self._medida_rendimiento["limite_alcanzado"] = True
+                    return
+                t0 = reloj()
+                f, _, _, nodo = pq[0]
+                if abiertos.get(nodo.estado) is not nodo:
+                    heapq.heappop(pq)  # entrada obsoleta
+                    est.t_cola += reloj() - t0
+                    continue
+                if meta is not None and meta.g <= f:
+                    break
+                heapq.heappop(pq)
+                est.t_cola += reloj() - t0
+                del abiertos[nodo.estado]
+                cerrados.add(nodo.estado)
+                for hijo in self._expandir(nodo):
+                    previo = mejor.get(hijo.estado)
+                    if previo is not None and previo.g <= hijo.g:
+                        est.duplicados += 1
                         continue
-                    nuevo = camino + [hijo]
-                    g_nuevo = self.get_costo(nuevo)
-
-                    if self.tecnica in ('costouniforme', 'astar'):
-                        # Relaxation estilo Dijkstra/A*: solo si mejora g del ultimo
-                        if hijo not in best_g or g_nuevo < best_g[hijo]:
-                            best_g[hijo] = g_nuevo
-                            heapq.heappush(pq, (clave(nuevo), nuevo))
+                    mejor[hijo.estado] = hijo
+                    if self.test_objetivo(hijo.estado):
+                        meta = hijo
+                    if hijo.estado in cerrados:
+                        est.reabiertos += 1
+                        incons[hijo.estado] = hijo
                     else:
-                        # Greedy ignora g, solo h
-                        heapq.heappush(pq, (clave(nuevo), nuevo))
+                        abiertos[hijo.estado] = hijo
+                        t0 = reloj()
+                        heapq.heappush(pq, (hijo.g + peso * h(hijo.estado), -hijo.g,
+                                            next(contador), hijo))
+                        est.t_cola += reloj() - t0
+                est.frontera(len(abiertos) + len(incons), len(cerrados))
+
+            if meta is None:
+                return  # sin solucion
+            # Cota de suboptimalidad: costo / min(g + h) de los estados pendientes
+            piso = min((n.g + h(e) for d in (abiertos, incons) for e, n in d.items()),
+                       default=float("inf"))
+            cota = max(1.0, min(peso, meta.g / piso)) if meta.g > 0 else 1.0
+            if entregada is None or (meta.g, cota) < entregada:
+                entregada = (meta.g, cota)
+                self.acciones = meta.camino()
+                tiempo = reloj() - inicio
+                historial.append({"costo": meta.g, "peso": peso, "cota": cota,
+                                  "expandidos": est.expandidos, "tiempo_s": tiempo})
+                self._medida_rendimiento.update(pasos=len(self.acciones) - 1, costo=meta.g,
+                                                peso=peso, cota=cota, soluciones=historial)
+                yield {"acciones": self.acciones, "costo": meta.g, "peso": peso, "cota": cota,
+                       "expandidos": est.expandidos, "tiempo_s": tiempo}
+            if cota <= 1.0:
+                return  # optima
+            peso = max(1.0, peso - self.paso_peso)
+            abiertos.update(incons)
+            incons.clear()
+
+    def _busqueda_idastar(self):
+        # IDA*: DFS acotada por f = g + h con umbral creciente; memoria O(d)
+        est = self.estadisticas
+        camino = [self.estado_inicial]
+        umbral = self._h_medida(self.estado_inicial)
+        iteraciones = []
+        expandidos = 0
+        costo = None
+
+        def buscar(g, umbral):
+            nonlocal nodos, expandidos, costo
+            estado = camino[-1]
+            nodos += 1
+            f = g + self._h_medida(estado)
+            if f > umbral:
+                return f
+            if self.test_objetivo(estado):
+                costo = g
+                return None
+            expandidos += 1
+            est.expandido(estado)
+            est.frontera(len(camino))
+            minimo = float("inf")
+            previo = camino[-2] if len(camino) > 1 else None
+            for hijo in self._sucesores_medidos(estado):
+                if hijo == previo:  # no deshacer el ultimo movimiento
+                    est.duplicados += 1
+                    continue
+                camino.append(hijo)
+                t = buscar(g + self.get_costo_paso(estado, hijo), umbral)
+                if t is None:
+                    return None
+                camino.pop()
+                minimo = min(minimo, t)
+            return minimo
+
+        while True:
+            nodos = 0
+            t = buscar(0, umbral)
+            iteraciones.append({"umbral": umbral, "nodos": nodos})
+            if t is None:
+                self.acciones = list(camino)
+                break
+            if t == float("inf"):
+                break
+            umbral = t
+
+        self._medida_rendimiento = {"iteraciones": iteraciones, "operaciones": expandidos}
+        if self.acciones:
+            self._medida_rendimiento.update(pasos=len(self.acciones) - 1, costo=costo)
+
+    def _busqueda_iddfs(self):
+        # Profundizacion iterativa: DFS con limite 0, 1, 2, ... guardando solo
+        # la ruta actual y los hijos pendientes de cada nivel (memoria O(d));
+        # la unica poda es no volver al estado del padre
+        est = self.estadisticas
+        iteraciones = []
+        limite, encontrado = 0, False
+
+        def hijos(camino):
+            est.expandido(camino[-1])
+            est.frontera(len(camino))
+            previo = camino[-2] if len(camino) > 1 else None
+            xs = []
+            for hijo in self._sucesores_medidos(camino[-1]):
+                if hijo == previo:
+                    est.duplicados += 1
+                    continue
+                xs.append(hijo)
+            return iter(xs)
+
+        while self.limite_profundidad is None or limite <= self.limite_profundidad:
+            camino = [self.estado_inicial]
+            pendientes = []  # pendientes[i]: hijos de camino[i] aun no visitados
+            nodos, cortado = 1, False
+            encontrado = self.test_objetivo(camino[0])
+            if not encontrado:
+                if limite > 0:
+                    pendientes.append(hijos(camino))
+                else:
+                    cortado = True
+            while pendientes:
+                hijo = next(pendientes[-1], None)
+                if hijo is None:
+                    pendientes.pop()
+                    camino.pop()
+                    continue
+                camino.append(hijo)
+                nodos += 1
+                if self.test_objetivo(hijo):
+                    encontrado = True
+                    break
+                if len(camino) - 1 < limite:
+                    pendientes.append(hijos(camino))
+                else:
+                    cortado = True
+                    camino.pop()
+            iteraciones.append({"limite": limite, "nodos": nodos})
+            if encontrado:
+                self.acciones = list(camino)
+                break
+            if not cortado:
+                break  # el espacio alcanzable se agoto sin llegar a la meta
+            limite += 1
+
+        self._medida_rendimiento = {"iteraciones": iteraciones,
+                                    "operaciones": est.expandidos}
+        if encontrado:
+            costo = sum(self.get_costo_paso(a, b) for a, b in zip(self.acciones, self.acciones[1:]))
+            self._medida_rendimiento.update(pasos=len(self.acciones) - 1, costo=costo)
+
+    def _paso_tiempo_real(self):
+        # LRTA* / RTA* (Korf, 1990): desde el estado actual se mira adelante
+        # con minimin de profundidad creciente (1, 2, ...) hasta agotar
+        # presupuesto_ms, quedandose con la ultima profundidad completa; se
+        # elige el hijo de menor c + v y se actualiza h del estado actual con
+        # el mejor valor (LRTA*, admisible: los ensayos repetidos convergen) o
+        # con el segundo mejor (RTA*, mejor dentro de un solo ensayo).
+        reloj = time.perf_counter
+        inicio = reloj()
+        fin = inicio + self.presupuesto_ms / 1000
+        self._nuevo_movimiento()
+        est = self.estadisticas
+        h = self.h_aprendida
+        actual = self.get_estado_actual()
+        if self.test_objetivo(actual):
+            self.acciones = [actual]
+            self._medida_rendimiento.update(latencia_ms=0.0, profundidad=0)
+            return
+
+        def valor(e):
+            v = h.get(e)
+            return self._h_medida(e) if v is None else v
+
+        class _SinTiempo(Exception):
+            pass
+
+        def minimin(estado, padre, d, g):
+            # menor g + h de la frontera a profundidad d bajo `estado`, pero
+            # nunca menos que g + h(estado): asi cuenta lo aprendido en los
+            # estados interiores y un ciclo entre dos estados sube su h
+            if self.test_objetivo(estado):
+                return g
+            propio = g + valor(estado)
+            if d == 0:
+                return propio
+            if reloj() >= fin:
+                raise _SinTiempo()
+            est.expandido(estado)
+            mejor = float("inf")
+            for hijo in self._sucesores_medidos(estado):
+                if hijo != padre:
+                    mejor = min(mejor, minimin(hijo, estado, d - 1,
+                                               g + self.get_costo_paso(estado, hijo)))
+            return max(propio, mejor)
+
+        est.expandido(actual)
+        hijos = [(hijo, self.get_costo_paso(actual, hijo)) for hijo in self._sucesores_medidos(actual)]
+        if not hijos:
+            raise ValueError("El estado actual no tiene sucesores")
+        valores = [c + minimin(hijo, actual, 0, 0) for hijo, c in hijos]
+        # lo hecho hasta aca (limpieza, expansion y profundidad 0) se reserva
+        # otra vez para ordenar los hijos y actualizar h antes del plazo
+        fin -= reloj() - inicio
+        profundidad = 1
+        try:
+            while reloj() < fin:
+                valores = [c + minimin(hijo, actual, profundidad, 0) for hijo, c in hijos]
+                profundidad += 1
+        except _SinTiempo:
+            pass
+
+        orden = sorted(range(len(hijos)), key=valores.__getitem__)
+        mejor = valores[orden[0]]
+        segundo = valores[orden[1]] if len(orden) > 1 else mejor
+        if self.tecnica == 'lrta':
+            h[actual] = max(valor(actual), mejor)
         else:
-            raise ValueError(f"Técnica no soportada: {self.tecnica}")
+            h[actual] = segundo
+        self.acciones = [actual, hijos[orden[0]][0]]
+        latencia = (reloj() - inicio) * 1000
+        self.latencias_ms.append(latencia)
+        self._medida_rendimiento.update(latencia_ms=latencia, profundidad=profundidad,
+                                        valor=mejor, h_actual=h[actual])
+
+    def _nuevo_movimiento(self):
+        """Al empezar cada movimiento de 'lrta'/'rta', dentro del presupuesto.
+
+        Las subclases vacian aca sus caches por busqueda: en tiempo real solo
+        h_aprendida debe durar entre movimientos.
+        """
+
+    def _busqueda_hda(self):
+        # HDA* (ver Paralelo.py): las estadisticas de los trabajadores se
+        # suman; los picos tambien, como cota de la memoria total
+        k = self.trabajadores or os.cpu_count() or 1
+        ruta, costo, detalle = busqueda_hda(self, k, self.lote)
+        est = self.estadisticas
+        for d in detalle["por_trabajador"]:
+            for campo, valor in d.items():
+                setattr(est, campo, getattr(est, campo) + valor)
+        if ruta is not None:
+            self.acciones = ruta
+            self._medida_rendimiento.update(pasos=len(ruta) - 1, costo=costo)
+        # los trabajadores expanden en sus propios procesos
+        self._medida_rendimiento.update(
+            operaciones=est.expandidos, trabajadores=k, lotes_enviados=detalle["lotes_enviados"],
+            rondas_sondeo=detalle["rondas_sondeo"],
+            expandidos_por_trabajador=[d["expandidos"] for d in detalle["por_trabajador"]])
+
+    @staticmethod
+    def _unir(nodo_ida, nodo_vuelta):
+        """Ruta inicial -> encuentro (punteros de ida) + encuentro -> meta (de vuelta)."""
+        ruta = nodo_ida.camino()
+        nodo = nodo_vuelta.padre
+        while nodo is not None:
+            ruta.append(nodo.estado)
+            nodo = nodo.padre
+        return ruta
+
+    def _busqueda_bidireccional(self):
+        # BFS por capas desde ambos extremos (costo unitario); se expande
+        # siempre la capa mas chica y al completar una capa con encuentros
+        # se toma el de menor profundidad total.
+        ida = {self.estado_inicial: Nodo(self.estado_inicial)}
+        vuelta = {self.estado_meta: Nodo(self.estado_meta)}
+        if self.estado_meta in ida:
+            self.acciones = [self.estado_inicial]
+            return
+        capa_ida, capa_vuelta = list(ida.values()), list(vuelta.values())
+        while capa_ida and capa_vuelta:
+            adelante = len(capa_ida) <= len(capa_vuelta)
+            if adelante:
+                capa, propio, otro, sucesores = capa_ida, ida, vuelta, self.get_hijos
+            else:
+                capa, propio, otro, sucesores = capa_vuelta, vuelta, ida, self.get_predecesores
+            nueva, encuentro = [], None
+            est = self.estadisticas
+            for nodo in capa:
+                est.expandido(nodo.estado)
+                for accion, hijo in enumerate(self._sucesores_medidos(nodo.estado, sucesores)):
+                    if hijo in propio:
+                        est.duplicados += 1
+                        continue
+                    n = Nodo(hijo, nodo.g + 1, nodo, accion)
+                    propio[hijo] = n
+                    nueva.append(n)
+                    if hijo in otro and (encuentro is None or
+                                         n.g + otro[hijo].g < encuentro[0]):
+                        encuentro = (n.g + otro[hijo].g, hijo)
+            if encuentro is not None:
+                self.acciones = self._unir(ida[encuentro[1]], vuelta[encuentro[1]])
+                self._medida_rendimiento = {"pasos": encuentro[0], "costo": encuentro[0],
+                                            "nodos_ida": len(ida), "nodos_vuelta": len(vuelta)}
+                return
+            est.frontera(len(nueva), len(ida) + len(vuelta))
+            if adelante:
+                capa_ida = nueva
+            else:
+                capa_vuelta = nueva
+
+    def _busqueda_mm(self):
+        # MM (Holte et al., 2016): cada sentido ordena por pr = max(g + h, 2g);
+        # U = mejor costo de encuentro visto y se termina cuando U <= C, el
+        # minimo pr de ambas fronteras (ninguna ruta pendiente puede mejorar U).
+        raices = (Nodo(self.estado_inicial), Nodo(self.estado_meta))
+        hs = (self.get_heuristica, self.get_heuristica_inversa)
+        sucesores = (self.get_hijos, self.get_predecesores)
+        mejor = ({raices[0].estado: raices[0]}, {raices[1].estado: raices[1]})
+
+        est = self.estadisticas
+        reloj = time.perf_counter
+
+        def prioridad(lado, nodo):
+            return max(nodo.g + self._h_medida(nodo.estado, hs[lado]), 2 * nodo.g)
+
+        abiertos = ([(prioridad(0, raices[0]), raices[0])],
+                    [(prioridad(1, raices[1]), raices[1])])
+        U, encuentro = float("inf"), None
+        if self.estado_inicial == self.estado_meta:
+            U, encuentro = 0, self.estado_inicial
+
+        while True:
+            t0 = reloj()
+            for lado in (0, 1):  # descarta entradas obsoletas del tope
+                pq = abiertos[lado]
+                while pq and mejor[lado][pq[0][1].estado] is not pq[0][1]:
+                    heapq.heappop(pq)
+            est.t_cola += reloj() - t0
+            if not abiertos[0] or not abiertos[1]:
+                break
+            C = min(abiertos[0][0][0], abiertos[1][0][0])
+            if U <= C:
+                break
+            lado = 0 if abiertos[0][0][0] <= abiertos[1][0][0] else 1
+            t0 = reloj()
+            _, nodo = heapq.heappop(abiertos[lado])
+            est.t_cola += reloj() - t0
+            est.expandido(nodo.estado)
+            propio, otro = mejor[lado], mejor[1 - lado]
+            for accion, hijo in enumerate(self._sucesores_medidos(nodo.estado, sucesores[lado])):
+                if lado == 0:
+                    g = nodo.g + self.get_costo_paso(nodo.estado, hijo)
+                else:
+                    g = nodo.g + self.get_costo_paso(hijo, nodo.estado)
+                previo = propio.get(hijo)
+                if previo is not None and previo.g <= g:
+                    est.duplicados += 1
+                    continue
+                if previo is not None:
+                    est.reabiertos += 1
+                n = Nodo(hijo, g, nodo, accion)
+                propio[hijo] = n
+                pr = prioridad(lado, n)
+                t0 = reloj()
+                heapq.heappush(abiertos[lado], (pr, n))
+                est.t_cola += reloj() - t0
+                o = otro.get(hijo)
+                if o is not None and g + o.g < U:
+                    U, encuentro = g + o.g, hijo
+            est.frontera(len(abiertos[0]) + len(abiertos[1]), len(mejor[0]) + len(mejor[1]))
+
+        if encuentro is not None:
+            self.acciones = self._unir(mejor[0][encuentro], mejor[1][encuentro])
+            self._medida_rendimiento = {"pasos": len(self.acciones) - 1, "costo": U,
+                                        "nodos_ida": len(mejor[0]), "nodos_vuelta": len(mejor[1])}
+
+    def _limite_nodos(self, raiz):
+        if self.max_bytes is not None:
+            # nodo + estado + entrada en el indice por estado (aprox.)
+            por_nodo = sys.getsizeof(raiz) + sys.getsizeof(raiz.estado) + 100
+            return max(2, self.max_bytes // por_nodo)
+        return self.max_nodos if self.max_nodos is not None else 100_000
+
+    def _busqueda_smastar(self):
+        # SMA* (Russell, 1992) con expansion completa: se expande el nodo de
+        # menor f (el mas profundo ante empates); si se supera el presupuesto
+        # se olvida la hoja de mayor f (la menos profunda ante empates) y su f
+        # se respalda en el padre, que vuelve a la frontera para regenerarla.
+        est = self.estadisticas
+        raiz = NodoAcotado(self.estado_inicial, f=self._h_medida(self.estado_inicial))
+        limite = self._limite_nodos(raiz)
+        contador = itertools.count()
+        abiertos, expulsables = [], []
+        en_memoria = {raiz.estado: raiz}  # estado -> nodo de menor g en memoria
+        stats = {"evicciones": 0, "regenerados": 0}
+        total, pico = 1, 1
+
+        def abrir(n):
+            n.version += 1
+            n.en_abiertos = True
+            c = next(contador)
+            heapq.heappush(abiertos, (n.f, -n.profundidad, c, n.version, n))
+            heapq.heappush(expulsables, (-n.f, n.profundidad, c, n.version, n))
+
+        def cerrar(n):
+            n.version += 1
+            n.en_abiertos = False
+
+        def respaldar(n):
+            while n is not None:
+                valores = [h.f for h in n.hijos.values()] + list(n.olvidados.values())
+                nuevo = min(valores) if valores else float("inf")
+                if nuevo == n.f:
+                    break
+                n.f = nuevo
+                if n.en_abiertos:
+                    abrir(n)
+                n = n.padre
+
+        def olvidar(protegidos):
+            # hoja en la frontera con mayor f y menor profundidad
+            apartadas, n = [], None
+            while expulsables:
+                entrada = heapq.heappop(expulsables)
+                _, _, _, version, c = entrada
+                if (c.vivo and c.en_abiertos and c.version == version and not c.hijos
+                        and c.padre is not None):
+                    if c not in protegidos:
+                        n = c
+                        break
+                    apartadas.append(entrada)
+            for entrada in apartadas:
+                heapq.heappush(expulsables, entrada)
+            if n is None:
+                return False
+            n.vivo = False
+            cerrar(n)
+            if en_memoria.get(n.estado) is n:
+                del en_memoria[n.estado]
+            padre = n.padre
+            del padre.hijos[n.accion]
+            padre.olvidados[n.accion] = n.f
+            if not padre.en_abiertos:
+                abrir(padre)
+            elif not padre.hijos:
+                heapq.heappush(expulsables, (-padre.f, padre.profundidad, next(contador),
+                                             padre.version, padre))
+            stats["evicciones"] += 1
+            return True
+
+        abrir(raiz)
+        while abiertos:
+            f, _, _, version, nodo = heapq.heappop(abiertos)
+            if not nodo.vivo or not nodo.en_abiertos or nodo.version != version:
+                continue
+            if f == float("inf"):
+                break
+            if self.test_objetivo(nodo.estado):
+                self.acciones = nodo.camino()
+                self._medida_rendimiento.update(pasos=len(self.acciones) - 1, costo=nodo.g)
+                break
+
+            cerrar(nodo)
+            est.expandido(nodo.estado)
+            previo = nodo.padre.estado if nodo.padre is not None else None
+            protegidos = {nodo}
+            for accion, hijo in enumerate(self._sucesores_medidos(nodo.estado)):
+                if accion in nodo.hijos or hijo == previo:
+                    continue
+                g = nodo.g + self.get_costo_paso(nodo.estado, hijo)
+                otro = en_memoria.get(hijo)
+                if otro is not None and otro.g <= g:
+                    nodo.olvidados.pop(accion, None)
+                    est.duplicados += 1
+                    continue  # el estado ya esta en memoria con un camino igual o mejor
+                if nodo.profundidad + 1 >= limite - 1 and not self.test_objetivo(hijo):
+                    f_hijo = float("inf")  # el camino no cabe en memoria
+                else:
+                    f_hijo = max(nodo.f, g + self._h_medida(hijo))
+                if accion in nodo.olvidados:
+                    f_hijo = max(f_hijo, nodo.olvidados.pop(accion))
+                    stats["regenerados"] += 1
+                # se libera lugar antes de cada hijo: nunca hay mas de `limite` nodos
+                if total >= limite:
+                    if not olvidar(protegidos):
+                        # nada que olvidar: el hijo queda olvidado y se regenera despues
+                        nodo.olvidados[accion] = f_hijo
+                        continue
+                    total -= 1
+                n = NodoAcotado(hijo, g, nodo, accion, f_hijo)
+                nodo.hijos[accion] = n
+                en_memoria[hijo] = n
+                protegidos.add(n)
+                abrir(n)
+                total += 1
+            pico = max(pico, total)
+            est.frontera(len(abiertos), total)
+            respaldar(nodo)
+            if nodo.olvidados or not nodo.hijos:
+                # hijos olvidados por regenerar, o hoja muerta (f = inf) para liberar
+                abrir(nodo)
+
+        self._medida_rendimiento.update(limite_nodos=limite, pico_nodos=pico, **stats)
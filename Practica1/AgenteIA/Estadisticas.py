@@ -0,0 +1,62 @@
+from time import perf_counter
+
+
+class BusquedaCancelada(Exception):
+    """Se lanza en la siguiente expansion despues de AgenteBuscador.cancelar()."""
+
+
+class Estadisticas:
+    """Contadores y tiempos por fase de una busqueda.
+
+    - generados: hijos devueltos por la funcion sucesor.
+    - expandidos: nodos a los que se les generaron los hijos.
+    - duplicados: hijos descartados por existir ya con un g igual o mejor.
+    - reabiertos: estados ya expandidos que vuelven a la frontera por un g mejor.
+    - pico_abiertos / pico_cerrados: tamano maximo de la frontera y del
+      conjunto de estados expandidos (o visitados).
+    - t_heuristica, t_sucesores, t_cola: segundos en evaluar h, en generar
+      sucesores y en operaciones de la frontera.
+
+    `al_expandir` es una lista de funciones fun(estado, estadisticas) que se
+    llaman en cada expansion. Los contadores se pueden leer desde otro hilo
+    mientras la busqueda corre; `cancelada` la detiene en la proxima expansion.
+    """
+
+    CONTADORES = ("generados", "expandidos", "duplicados", "reabiertos",
+                  "pico_abiertos", "pico_cerrados")
+    TIEMPOS = ("t_heuristica", "t_sucesores", "t_cola")
+
+    def __init__(self, al_expandir=()):
+        for c in self.CONTADORES:
+            setattr(self, c, 0)
+        for t in self.TIEMPOS:
+            setattr(self, t, 0.0)
+        self.al_expandir = list(al_expandir)
+        self.cancelada = False
+
+    def expandido(self, estado):
+        if self.cancelada:
+            raise BusquedaCancelada()
+        self.expandidos += 1
+        for fun in self.al_expandir:
+            fun(estado, self)
+
+    def frontera(self, abiertos, cerrados=None):
+        """Actualiza los picos con los tamanos actuales."""
+        if abiertos > self.pico_abiertos:
+            self.pico_abiertos = abiertos
+        if cerrados is not None and cerrados > self.pico_cerrados:
+            self.pico_cerrados = cerrados
+
+    def medir(self, campo, fun, *args):
+        """Llama fun(*args) sumando su duracion al tiempo `campo`."""
+        t0 = perf_counter()
+        r = fun(*args)
+        setattr(self, campo, getattr(self, campo) + perf_counter() - t0)
+        return r
+
+    def como_dict(self):
+        return {c: getattr(self, c) for c in self.CONTADORES + self.TIEMPOS}
+
+    def __repr__(self):
+        return f"Estadisticas({self.como_dict()})"
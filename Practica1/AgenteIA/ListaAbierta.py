@@ -0,0 +1,137 @@
+import heapq
+import itertools
+
+
+class ListaAbierta:
+    """Frontera de la busqueda mejor-primero: push(nodo, f) / pop() -> nodo.
+
+    Las entradas obsoletas no se borran (borrado perezoso): el buscador las
+    descarta al sacarlas si ya existe un nodo mejor para ese estado.
+    """
+
+    nombre = None
+
+    def __init__(self):
+        self.pico = 0
+
+    def push(self, nodo, f):
+        raise Exception("Se debe implementar el metodo")
+
+    def pop(self):
+        raise Exception("Se debe implementar el metodo")
+
+    def __len__(self):
+        raise Exception("Se debe implementar el metodo")
+
+
+class ColaHeap(ListaAbierta):
+    """heapq sobre (f, nodo): los empates se resuelven comparando caminos
+    (Nodo.__lt__), como antes de las listas abiertas, asi que las rutas no
+    cambian. Es la lista por defecto.
+    """
+
+    nombre = "heap"
+
+    def __init__(self):
+        super().__init__()
+        self._pq = []
+
+    def push(self, nodo, f):
+        heapq.heappush(self._pq, (f, nodo))
+        if len(self._pq) > self.pico:
+            self.pico = len(self._pq)
+
+    def pop(self):
+        return heapq.heappop(self._pq)[1]
+
+    def __len__(self):
+        return len(self._pq)
+
+
+class ColaHeapProfundo(ListaAbierta):
+    """heapq sobre (f, -g, -orden, nodo): la clave de desempate se arma una
+    sola vez al insertar. Ante igual f sale primero el de mayor g y, a igual
+    g, el ultimo insertado (el mismo orden que ColaCubetas). Mas rapida que
+    ColaHeap cuando hay muchos empates, pero cambia las rutas de igual f (y
+    en codicioso, donde f = h, su largo).
+    """
+
+    nombre = "heap_g"
+
+    def __init__(self):
+        super().__init__()
+        self._pq = []
+        self._orden = itertools.count()
+
+    def push(self, nodo, f):
+        heapq.heappush(self._pq, (f, -nodo.g, -next(self._orden), nodo))
+        if len(self._pq) > self.pico:
+            self.pico = len(self._pq)
+
+    def pop(self):
+        return heapq.heappop(self._pq)[-1]
+
+    def __len__(self):
+        return len(self._pq)
+
+
+class ColaCubetas(ListaAbierta):
+    """Cubetas de dos niveles indexadas por f y luego por g (f y g enteros).
+
+    push y pop son O(1) amortizado; ante igual f sale primero el nodo de
+    mayor g (el mas profundo, mas cerca de la meta) y dentro de una misma
+    cubeta el ultimo insertado.
+    """
+
+    nombre = "cubetas"
+
+    def __init__(self):
+        super().__init__()
+        self._cubetas = []  # f -> [g -> [nodos]]
+        self._gmax = []     # f -> mayor g que puede tener nodos
+        self._fmin = 0
+        self._n = 0
+
+    def push(self, nodo, f):
+        g = nodo.g
+        if f != int(f) or g != int(g) or f < 0:
+            raise ValueError(f"ColaCubetas requiere f y g enteros no negativos (f={f}, g={g})")
+        f, g = int(f), int(g)
+        while len(self._cubetas) <= f:
+            self._cubetas.append([])
+            self._gmax.append(-1)
+        por_g = self._cubetas[f]
+        while len(por_g) <= g:
+            por_g.append([])
+        por_g[g].append(nodo)
+        if g > self._gmax[f]:
+            self._gmax[f] = g
+        if f < self._fmin:
+            self._fmin = f
+        self._n += 1
+        if self._n > self.pico:
+            self.pico = self._n
+
+    def pop(self):
+        if not self._n:
+            raise IndexError("pop de una lista abierta vacia")
+        while True:
+            por_g, g = self._cubetas[self._fmin], self._gmax[self._fmin]
+            while g >= 0 and not por_g[g]:
+                g -= 1
+            self._gmax[self._fmin] = g
+            if g >= 0:
+                break
+            self._fmin += 1
+        self._n -= 1
+        return por_g[g].pop()
+
+    def __len__(self):
+        return self._n
+
+
+LISTAS_ABIERTAS = {
+    ColaHeap.nombre: ColaHeap,
+    ColaHeapProfundo.nombre: ColaHeapProfundo,
+    ColaCubetas.nombre: ColaCubetas,
+}
@@ -0,0 +1,65 @@
+class Nodo:
+    """Registro de un nodo del grafo de busqueda: estado, g, padre, accion y h.
+
+    Los caminos no se copian en cada expansion; solo se reconstruyen
+    siguiendo los punteros al padre cuando se alcanza la meta.
+    """
+
+    __slots__ = ("estado", "g", "padre", "accion", "profundidad", "h")
+
+    def __init__(self, estado, g=0, padre=None, accion=None, h=None):
+        self.estado = estado
+        self.g = g
+        self.padre = padre
+        self.accion = accion
+        self.h = h  # None hasta que se evalua (ver AgenteBuscador._h_nodo)
+        self.profundidad = 0 if padre is None else padre.profundidad + 1
+
+    def camino(self):
+        """Lista de estados desde la raiz hasta este nodo."""
+        ruta = []
+        nodo = self
+        while nodo is not None:
+            ruta.append(nodo.estado)
+            nodo = nodo.padre
+        ruta.reverse()
+        return ruta
+
+    def __lt__(self, otro):
+        # Desempate lexicografico por camino (igual que comparar listas de
+        # estados), recorriendo solo hasta el ancestro comun.
+        if self is otro:
+            return False
+        a, b = self, otro
+        cola_a, cola_b = [], []
+        while a.profundidad > b.profundidad:
+            cola_a.append(a.estado); a = a.padre
+        while b.profundidad > a.profundidad:
+            cola_b.append(b.estado); b = b.padre
+        while a is not b:
+            cola_a.append(a.estado); cola_b.append(b.estado)
+            a, b = a.padre, b.padre
+        cola_a.reverse(); cola_b.reverse()
+        return cola_a < cola_b
+
+    def __repr__(self):
+        return f"Nodo({self.estado!r}, g={self.g})"
+
+
+class NodoAcotado(Nodo):
+    """Nodo de la busqueda con memoria acotada (SMA*).
+
+    Guarda su f respaldado, los hijos que siguen en memoria y, por accion,
+    el f de los hijos que se olvidaron al liberar memoria.
+    """
+
+    __slots__ = ("f", "hijos", "olvidados", "version", "en_abiertos", "vivo")
+
+    def __init__(self, estado, g=0, padre=None, accion=None, f=0):
+        super().__init__(estado, g, padre, accion)
+        self.f = f
+        self.hijos = {}
+        self.olvidados = {}
+        self.version = 0
+        self.en_abiertos = False
+        self.vivo = True
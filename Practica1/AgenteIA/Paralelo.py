@@ -0,0 +1,230 @@
+"""HDA*: A* paralelo con los estados repartidos por hash entre procesos.
+
+Cada trabajador es dueno de los estados cuyo hash cae en su indice: solo el
+guarda su g, su padre y su lista abierta, asi que no hay tablas compartidas
+ni cerrojos por estado (Kishimoto, Fukunaga y Botea, 2009). Los hijos de
+otro dueno se juntan por destino y se le envian en lotes por su cola.
+
+Terminacion: el menor costo de meta hallado (la incumbente) esta en
+memoria compartida y ningun trabajador expande nodos con f >= incumbente.
+El coordinador sondea a todos; termina cuando dos sondeos seguidos los
+encuentran inactivos (sin nodos con f < incumbente y sin lotes por enviar)
+con los mismos totales de lotes enviados y recibidos, iguales entre si
+(metodo de los cuatro contadores de Mattern): no queda ningun lote en viaje
+que pueda reabrir trabajo, y con h admisible la incumbente es el optimo.
+La ruta se arma al final pidiendo a cada dueno el padre de sus estados.
+"""
+import heapq
+import itertools
+import multiprocessing as mp
+import queue
+import time
+import traceback
+
+from AgenteIA.Estadisticas import BusquedaCancelada
+
+_MASCARA = 0xFFFFFFFFFFFFFFFF
+
+
+def duenio(estado, trabajadores):
+    """Indice del trabajador que guarda `estado` (hash mezclado con splitmix64)."""
+    z = hash(estado) & _MASCARA
+    z = (z ^ (z >> 30)) * 0xBF58476D1CE4E5B9 & _MASCARA
+    z = (z ^ (z >> 27)) * 0x94D049BB133111EB & _MASCARA
+    return (z ^ (z >> 31)) % trabajadores
+
+
+def _trabajador(agente, i, entradas, salida, incumbente, cerrojo, lote):
+    try:
+        _buscar(agente, i, entradas, salida, incumbente, cerrojo, lote)
+    except Exception:
+        salida.put(("error", i, traceback.format_exc()))
+
+
+def _buscar(agente, i, entradas, salida, incumbente, cerrojo, lote):
+    k = len(entradas)
+    est = agente.estadisticas
+    entrada = entradas[i]
+    g, padre = {}, {}
+    abiertos = []  # (f, -g, orden, estado): a igual f, primero el mas profundo
+    orden = itertools.count()
+    salientes = [[] for _ in range(k)]
+    enviados = recibidos = 0
+
+    def recibir(estado, gv, p):
+        previo = g.get(estado)
+        if previo is not None and gv >= previo:
+            est.duplicados += 1
+            return
+        if previo is not None:
+            est.reabiertos += 1
+        g[estado] = gv
+        padre[estado] = p
+        f = gv + agente._h_medida(estado)
+        if f < incumbente.value:  # la incumbente solo baja: podarlo es definitivo
+            heapq.heappush(abiertos, (f, -gv, next(orden), estado))
+
+    def vaciar():
+        nonlocal enviados
+        for j, pendientes in enumerate(salientes):
+            if pendientes:
+                entradas[j].put(("lote", pendientes))
+                salientes[j] = []
+                enviados += 1
+
+    def hay_trabajo():
+        return bool(abiertos) and abiertos[0][0] < incumbente.value
+
+    if duenio(agente.estado_inicial, k) == i:
+        recibir(agente.estado_inicial, 0, None)
+
+    while True:
+        # 1) mensajes: sin esperar si hay trabajo, si no hasta que llegue uno
+        mensajes = []
+        try:
+            while True:
+                mensajes.append(entrada.get_nowait() if mensajes or hay_trabajo()
+                                else entrada.get())
+        except queue.Empty:
+            pass
+        for msg in mensajes:
+            tipo = msg[0]
+            if tipo == "lote":
+                recibidos += 1
+                for estado, gv, p in msg[1]:
+                    recibir(estado, gv, p)
+            elif tipo == "sondeo":
+                vaciar()
+                salida.put(("sondeo", msg[1], i, not hay_trabajo(), enviados, recibidos))
+            elif tipo == "padre":
+                salida.put(("padre", msg[1], padre[msg[1]]))
+            elif tipo == "salir":
+                salida.put(("estadisticas", i, est.como_dict()))
+                return
+
+        # 2) hasta `lote` expansiones; los hijos ajenos salen en lotes
+        for _ in range(lote):
+            if not hay_trabajo():
+                break
+            f, menos_g, _, estado = heapq.heappop(abiertos)
+            gv = -menos_g
+            if g[estado] != gv:
+                continue  # entrada obsoleta
+            if agente.test_objetivo(estado):
+                with cerrojo:
+                    if gv < incumbente.value:
+                        incumbente.value = gv
+                        salida.put(("meta", estado, gv))
+                continue
+            est.expandido(estado)
+            for hijo in agente._sucesores_medidos(estado):
+                c = gv + agente.get_costo_paso(estado, hijo)
+                j = duenio(hijo, k)
+                if j == i:
+                    recibir(hijo, c, estado)
+                else:
+                    salientes[j].append((hijo, c, estado))
+                    if len(salientes[j]) >= lote:
+                        entradas[j].put(("lote", salientes[j]))
+                        salientes[j] = []
+                        enviados += 1
+        vaciar()
+        est.frontera(len(abiertos), len(g))
+
+
+def busqueda_hda(agente, trabajadores, lote=64, intervalo=0.002):
+    """Corre HDA* con `trabajadores` procesos sobre los metodos de `agente`.
+
+    Devuelve (ruta, costo, detalle); ruta es None si no hay solucion. Los
+    trabajadores heredan el agente por fork, asi que la heuristica y las
+    funciones sucesor no necesitan ser serializables.
+    """
+    if trabajadores < 1:
+        raise ValueError("Se necesita al menos un trabajador")
+    if "fork" not in mp.get_all_start_methods():
+        raise ValueError("HDA* necesita procesos con fork (Linux/macOS)")
+    ctx = mp.get_context("fork")
+    entradas = [ctx.Queue() for _ in range(trabajadores)]
+    salida = ctx.Queue()
+    # se lee sin cerrojo en cada nodo (un double se lee entero); solo se escribe con el
+    incumbente = ctx.RawValue("d", float("inf"))
+    cerrojo = ctx.Lock()
+    procesos = [ctx.Process(target=_trabajador, daemon=True,
+                            args=(agente, i, entradas, salida, incumbente, cerrojo, lote))
+                for i in range(trabajadores)]
+    for p in procesos:
+        p.start()
+
+    meta = None
+
+    def recibir(tipo):
+        # siguiente mensaje `tipo` del coordinador; anota metas y propaga errores
+        nonlocal meta
+        while True:
+            if agente._cancelar:
+                raise BusquedaCancelada()
+            try:
+                msg = salida.get(timeout=0.5)
+            except queue.Empty:
+                if not all(p.is_alive() for p in procesos):
+                    raise RuntimeError("Un trabajador de HDA* termino sin avisar")
+                continue
+            if msg[0] == "error":
+                raise RuntimeError(f"Trabajador {msg[1]} de HDA* fallo:\n{msg[2]}")
+            if msg[0] == "meta":
+                if meta is None or msg[2] < meta[1]:
+                    meta = (msg[1], msg[2])
+            elif msg[0] == tipo:
+                return msg
+
+    try:
+        ronda, previo = 0, None
+        while True:
+            ronda += 1
+            for q in entradas:
+                q.put(("sondeo", ronda))
+            respuestas = []
+            while len(respuestas) < trabajadores:
+                msg = recibir("sondeo")
+                if msg[1] == ronda:
+                    respuestas.append(msg)
+            inactivos = all(r[3] for r in respuestas)
+            totales = (sum(r[4] for r in respuestas), sum(r[5] for r in respuestas))
+            if inactivos and totales[0] == totales[1] and totales == previo:
+                break
+            previo = totales if inactivos else None
+            time.sleep(intervalo)
+
+        ruta = None
+        if meta is not None:
+            ruta = [meta[0]]
+            while True:
+                entradas[duenio(ruta[-1], trabajadores)].put(("padre", ruta[-1]))
+                anterior = recibir("padre")[2]
+                if anterior is None:
+                    break
+                ruta.append(anterior)
+            ruta.reverse()
+
+        for q in entradas:
+            q.put(("salir",))
+        por_trabajador = [None] * trabajadores
+        for _ in range(trabajadores):
+            msg = recibir("estadisticas")
+            por_trabajador[msg[1]] = msg[2]
+        for p in procesos:
+            p.join()
+    finally:
+        # cancelada o con error: no esperar a que se lean los mensajes pendientes
+        vivos = [p for p in procesos if p.is_alive()]
+        for p in vivos:
+            p.terminate()
+        for p in vivos:
+            p.join()
+        if vivos:
+            for q in entradas:
+                q.cancel_join_thread()
+
+    detalle = {"trabajadores": trabajadores, "lote": lote, "rondas_sondeo": ronda,
+               "lotes_enviados": totales[0], "por_trabajador": por_trabajador}
+    return ruta, (None if meta is None else meta[1]), detalle
@@ -1,15 +1,67 @@
-from typing import Callable, List, Any
+from collections import OrderedDict
+from time import perf_counter
+from typing import Callable, List, Any, Optional
 from AgenteIA.AgenteBuscador import AgenteBuscador
-from .tablero import Tablero
+from AgenteIA.Nodo import Nodo
+from .tablero import Tablero, vecinos_blanco, es_resoluble
+from .heuristicas import INCREMENTALES, h_manhattan_hacia
+from .metas import tabla_meta
+from .compacto import tabla_movimientos, empaquetar, desempaquetar, FichasCompactas
+from .cache_soluciones import CacheSoluciones
+
+# Tecnicas cuyas rutas son optimas (con h admisible) y pueden guardarse en la
+# cache de soluciones. SMA* entra: si el optimo no cabe en memoria no devuelve
+# ninguna ruta, porque tampoco cabe una meta mas profunda.
+OPTIMAS = {'anchura', 'costouniforme', 'astar', 'idastar', 'iddfs', 'bidireccional', 'mm',
+           'smastar', 'hda'}
 
 class AgenteNPuzzle(AgenteBuscador):
-    def __init__(self, N: int, heuristica: Callable[[Tablero], int], tecnica: str):
+    def __init__(self, N: int, heuristica: Callable[[Tablero], int], tecnica: str,
+                 validar_h: bool = False, compacto: bool = False, lista_abierta: str = 'heap',
+                 max_nodos: Optional[int] = None, max_bytes: Optional[int] = None,
+                 max_cache: Optional[int] = None,
+                 cache_soluciones: Optional[CacheSoluciones] = None,
+                 peso: float = 2.0, paso_peso: float = 0.5,
+                 limite_tiempo: Optional[float] = None,
+                 limite_profundidad: Optional[int] = None,
+                 presupuesto_ms: float = 10.0,
+                 trabajadores: Optional[int] = None):
         super().__init__()
+        self.lista_abierta = lista_abierta
+        self.max_nodos = max_nodos
+        self.max_bytes = max_bytes
+        # 'ponderado' usa f = g + peso*h; 'ara' arranca en peso y baja paso_peso por pasada
+        self.peso = peso
+        self.paso_peso = paso_peso
+        self.limite_tiempo = limite_tiempo
+        self.limite_profundidad = limite_profundidad
+        # 'lrta'/'rta': ms de planificacion por movimiento (ver tiempo_real.py)
+        self.presupuesto_ms = presupuesto_ms
+        # 'hda': procesos de A* paralelo (None = uno por CPU)
+        self.trabajadores = trabajadores
+        # max_cache: tope LRU de las caches de sucesores y de h (None = sin tope)
+        self.max_cache = max_cache
+        self._desalojos_cache = 0
+        # distancias exactas compartidas entre busquedas (ver cache_soluciones.py)
+        if cache_soluciones is not None and cache_soluciones.N != N:
+            raise ValueError(f"Cache de soluciones para N={cache_soluciones.N}, agente con N={N}")
+        self.cache_soluciones = cache_soluciones
+        self._usar_cache = False
         self.N = N
+        self.C = N              # columnas; fijar_estados las toma del tablero inicial
         self.heuristica = heuristica
+        # meta no estandar (None = 1..n-1, 0) y su TablaMeta para los deltas
+        self._meta: Optional[Tablero] = None
+        self._tabla_meta = tabla_meta(N, N, None)
+        # h del hijo = delta sobre h del padre; validar_h recalcula completo y compara
+        self._delta = INCREMENTALES.get(heuristica)
+        self.validar_h = validar_h
+        self._h: dict = {} if max_cache is None else OrderedDict()
+        # compacto: la busqueda trabaja con ints empaquetados (ver compacto.py)
+        self._tabla = tabla_movimientos(N) if compacto else None
         self._expandidos = 0
         self._modo = (tecnica or "").lower()
-        base_tecnica = 'costouniforme' if self._modo in ('astar', 'codicioso') else (self._modo or 'costouniforme')
+        base_tecnica = self._modo or 'costouniforme'
         if hasattr(self, 'set_tecnica'):
             self.set_tecnica(base_tecnica)
         else:
@@ -17,7 +69,7 @@ class AgenteNPuzzle(AgenteBuscador):
                 self.tecnica = base_tecnica
             except Exception:
                 pass
-        self._cache_succ: dict[Tablero, List[Tablero]] = {}
+        self._cache_succ: dict[Tablero, List[Tablero]] = {} if max_cache is None else OrderedDict()
         if hasattr(self, 'add_funcion'):
             self.add_funcion(self._sucesores)
         elif hasattr(self, 'add_funcion_sucesor'):
@@ -31,32 +83,277 @@ class AgenteNPuzzle(AgenteBuscador):
                     fs.append(self._sucesores)
 
     def fijar_estados(self, inicial: Tablero, meta: Tablero) -> None:
+        """Inicial y meta: cualquier par resoluble de la misma forma N x C."""
+        if inicial.N != self.N or meta.N != self.N or len(meta.fichas) != len(inicial.fichas):
+            raise ValueError(f"Agente con N={self.N} filas; tableros de {inicial.N}x{inicial.columnas} "
+                             f"y {meta.N}x{meta.columnas}")
+        if not es_resoluble(inicial, meta):
+            raise ValueError(f"La meta {meta.fichas} no es alcanzable desde {inicial.fichas}")
+        self.C = inicial.columnas
+        self._meta = None if meta.es_meta() else meta
+        m = tabla_meta(self.N, self.C, None if self._meta is None else meta.fichas)
+        if m is not self._tabla_meta:
+            # otra forma u otra meta: los h guardados ya no valen
+            self._tabla_meta = m
+            self._h.clear()
+            self._cache_succ.clear()
+            self.h_aprendida.clear()
+            if self._tabla is not None:
+                self._tabla = tabla_movimientos(self.N, self.C)
+        # la cache solo guarda distancias a la meta estandar de N x N; ARA* no
+        # la usa porque mezclar h exacta y h de la heuristica la vuelve
+        # inconsistente y la cota de cada pasada supone h consistente
+        self._usar_cache = (self.cache_soluciones is not None and self.tecnica != 'ara' and
+                            self.C == self.N and self._meta is None)
+        if self._tabla is not None:
+            inicial, meta = empaquetar(inicial), empaquetar(meta)
         if hasattr(self, 'set_estado_inicial'): self.set_estado_inicial(inicial)
         else: self.estado_inicial = inicial
         if hasattr(self, 'set_estado_meta'): self.set_estado_meta(meta)
         else: self.estado_meta = meta
         self._expandidos = 0
 
+    def _recordar(self, cache: dict, clave, valor) -> None:
+        cache[clave] = valor
+        if self.max_cache is not None and len(cache) > self.max_cache:
+            cache.popitem(last=False)
+            self._desalojos_cache += 1
+
     def _sucesores(self, t: Tablero) -> List[Tablero]:
-        if t in self._cache_succ: return self._cache_succ[t]
-        xs = list(t.sucesores())
-        self._cache_succ[t] = xs
+        if t in self._cache_succ:
+            if self.max_cache is not None: self._cache_succ.move_to_end(t)
+            return self._cache_succ[t]
+        movs = t.movimientos() if self._tabla is None else self._tabla.movimientos(t)
+        if self._delta is None:
+            xs = [hijo for hijo, _, _, _ in movs]
+        else:
+            h, xs = self._valor_h(t), []
+            t0 = perf_counter()
+            for hijo, ficha, desde, hasta in movs:
+                if hijo not in self._h:
+                    self._recordar(self._h, hijo, self._validar(
+                        hijo, self._delta(self._fichas(hijo), self._tabla_meta, h, ficha, desde, hasta)))
+                xs.append(hijo)
+            # los deltas de h cuentan como tiempo de heuristica, no de sucesores
+            dt = perf_counter() - t0
+            self.estadisticas.t_heuristica += dt
+            self.estadisticas.t_sucesores -= dt
+        self._recordar(self._cache_succ, t, xs)
         self._expandidos += 1
         return xs
 
+    def _expandir(self, nodo):
+        # Mejor-primero con h: el h del hijo es el delta sobre nodo.h y viaja en
+        # el Nodo, sin pasar por las caches de h ni de sucesores (A* expande
+        # cada estado una vez; guardarlos costaba mas que el delta ahorraba)
+        if self._delta is None or self._usar_cache or self.tecnica not in ('codicioso', 'astar', 'ponderado'):
+            return super()._expandir(nodo)
+        est = self.estadisticas
+        est.expandido(nodo.estado)
+        h = self._h_nodo(nodo)
+        t0 = perf_counter()
+        t = nodo.estado
+        movs = list(t.movimientos()) if self._tabla is None else self._tabla.movimientos(t)
+        t1 = perf_counter()
+        delta, m, g = self._delta, self._tabla_meta, nodo.g + 1  # costo unitario
+        if self.validar_h:
+            hijos = [Nodo(hijo, g, nodo, accion,
+                          self._validar(hijo, delta(self._fichas(hijo), m, h, ficha, desde, hasta)))
+                     for accion, (hijo, ficha, desde, hasta) in enumerate(movs)]
+        elif self._tabla is None:
+            hijos = [Nodo(hijo, g, nodo, accion, delta(hijo.fichas, m, h, ficha, desde, hasta))
+                     for accion, (hijo, ficha, desde, hasta) in enumerate(movs)]
+        else:
+            hijos = [Nodo(hijo, g, nodo, accion, delta(FichasCompactas(hijo, self._tabla), m, h,
+                                                       ficha, desde, hasta))
+                     for accion, (hijo, ficha, desde, hasta) in enumerate(movs)]
+        est.t_sucesores += t1 - t0
+        est.t_heuristica += perf_counter() - t1
+        est.generados += len(hijos)
+        return hijos
+
     def generar_hijos(self, estado): return self._sucesores(estado)
     def get_hijos(self, estado):     return self._sucesores(estado)
 
     def get_costo(self, camino: List[Tablero]) -> int:
-        g = len(camino) - 1
-        estado = camino[-1]
-        if self._modo == 'astar': return g + self.heuristica(estado)
-        if self._modo == 'codicioso': return self.heuristica(estado)
-        return g
+        return len(camino) - 1
 
     def get_heuristica(self, obj: Any) -> int:
         nodo = obj[-1] if isinstance(obj, list) and obj else obj
-        return self.heuristica(nodo)
+        if self._usar_cache:
+            d = self.cache_soluciones.distancia(nodo)
+            if d is not None:
+                return d
+        if self._delta is None:
+            return self._h_completa(self._tablero(nodo))
+        return self._valor_h(nodo)
+
+    def _h_completa(self, t: Tablero) -> int:
+        # la meta solo se pasa si no es la estandar, asi siguen sirviendo
+        # heuristicas de un solo argumento
+        if self._meta is None:
+            return self.heuristica(t)
+        return self.heuristica(t, self._meta)
+
+    def get_atajo(self, estado):
+        if not self._usar_cache:
+            return None
+        cola = self.cache_soluciones.ruta_desde(self._tablero(estado))
+        if cola is not None and self._tabla is not None:
+            cola = [empaquetar(t) for t in cola]
+        return cola
+
+    def get_heuristica_inversa(self, obj: Any) -> int:
+        # Hacia el inicial: las heuristicas con TablaMeta aceptan cualquier
+        # objetivo; las demas (PDBs, tabla perfecta) se reemplazan por Manhattan
+        t, inicial = self._tablero(obj), self._tablero(self.estado_inicial)
+        if self.heuristica in INCREMENTALES:
+            return self.heuristica(t, inicial)
+        return h_manhattan_hacia(t, inicial)
+
+    def _nuevo_movimiento(self):
+        # sin esto las caches crecen con cada movimiento y las pausas del GC
+        # se comen el presupuesto; lo que vale la pena conservar esta en h_aprendida
+        self._h.clear()
+        self._cache_succ.clear()
+
+    def get_estado_actual(self):
+        e = super().get_estado_actual()
+        return empaquetar(e) if self._tabla is not None and isinstance(e, Tablero) else e
+
+    def _tablero(self, e) -> Tablero:
+        return e if isinstance(e, Tablero) else desempaquetar(e, self.N, self.C)
+
+    def _fichas(self, e):
+        return e.fichas if self._tabla is None else FichasCompactas(e, self._tabla)
+
+    def _valor_h(self, t) -> int:
+        h = self._h.get(t)
+        if h is None:
+            h = self._h_completa(self._tablero(t))
+            self._recordar(self._h, t, h)
+        elif self.max_cache is not None:
+            self._h.move_to_end(t)
+        return h
+
+    def _validar(self, t, h: int) -> int:
+        if self.validar_h:
+            t = self._tablero(t)
+            completo = self._h_completa(t)
+            if completo != h:
+                raise ValueError(f"h incremental {h} != h completo {completo} en {t.fichas}")
+        return h
+
+    def programa(self):
+        self._aciertos_cache = self.cache_soluciones.aciertos if self._usar_cache else 0
+        super().programa()
+        if self._tabla is not None and self.acciones and not isinstance(self.acciones[0], Tablero):
+            self.acciones = [desempaquetar(p, self.N, self.C) for p in self.acciones]
+        if self._usar_cache and self.acciones and self.tecnica in OPTIMAS:
+            self.cache_soluciones.guardar_ruta(self.acciones)
+
+    def soluciones(self, limite_tiempo=None):
+        for s in super().soluciones(limite_tiempo):
+            if self._tabla is not None:
+                s["acciones"] = self.acciones = [desempaquetar(p, self.N, self.C) for p in s["acciones"]]
+            yield s
+
+    def _busqueda_idastar(self):
+        self._idastar_in_situ(self._h_completa, self._delta,
+                              self.cache_soluciones if self._usar_cache else None)
+
+    def _busqueda_iddfs(self):
+        # Profundizacion iterativa = IDA* con h = 0: el umbral sube de a un
+        # movimiento. Sin cache de soluciones, que daria distancias exactas.
+        self._idastar_in_situ(lambda t: 0, lambda *_: 0, None, self.limite_profundidad)
+        for it in self._medida_rendimiento["iteraciones"]:
+            it["limite"] = it.pop("umbral")
+
+    def _idastar_in_situ(self, heuristica, delta, cache, umbral_max=None):
+        # IDA* sobre una unica lista de fichas mutada in situ (mover/deshacer)
+        N = self.N
+        inicial = self._tablero(self.estado_inicial)
+        fichas = list(inicial.fichas)
+        meta = list(self._tablero(self.estado_meta).fichas)
+        vecinos = vecinos_blanco(N, self.C)
+        m = self._tabla_meta
+        blancos = [fichas.index(0)]  # pila de posiciones del blanco = ruta
+        est = self.estadisticas
+        iteraciones = []
+        validar = self.validar_h and delta is self._delta
+        tabla = tabla_movimientos(N, self.C)
+        cola = []  # ruta desde un estado de la cache hasta la meta
+
+        def buscar(g, h, umbral, previo):
+            nonlocal nodos
+            nodos += 1
+            f = g + h
+            if cache is not None:
+                # h exacta; los deltas siguen sobre h de la heuristica
+                d = cache.distancia(tabla.empaquetar(fichas))
+                if d is not None:
+                    f = g + d
+                    if f <= umbral:
+                        ruta = cache.ruta_desde(Tablero(N, tuple(fichas)))
+                        if ruta is not None:
+                            cola[:] = ruta
+                            return None
+            if f > umbral:
+                return f
+            if fichas == meta:
+                return None
+            self._expandidos += 1
+            est.expandido(Tablero(N, tuple(fichas)) if est.al_expandir else None)
+            est.frontera(len(blancos))
+            minimo = float("inf")
+            b = blancos[-1]
+            for j in vecinos[b]:
+                if j == previo:  # no deshacer el ultimo movimiento
+                    est.duplicados += 1
+                    continue
+                est.generados += 1
+                ficha = fichas[j]
+                fichas[b], fichas[j] = ficha, 0
+                blancos.append(j)
+                t0 = perf_counter()
+                if delta is None:
+                    hh = heuristica(Tablero(N, tuple(fichas)))
+                else:
+                    hh = delta(fichas, m, h, ficha, j, b)
+                    if validar:
+                        self._validar(Tablero(N, tuple(fichas)), hh)
+                est.t_heuristica += perf_counter() - t0
+                t = buscar(g + 1, hh, umbral, b)
+                if t is None:
+                    return None
+                blancos.pop()
+                fichas[j], fichas[b] = fichas[b], 0
+                minimo = min(minimo, t)
+            return minimo
+
+        h0 = umbral = heuristica(inicial)
+        while True:
+            nodos = 0
+            t = buscar(0, h0, umbral, None)
+            iteraciones.append({"umbral": umbral, "nodos": nodos})
+            if t is None or t == float("inf") or (umbral_max is not None and t > umbral_max):
+                break
+            umbral = t
+
+        self._medida_rendimiento = {"iteraciones": iteraciones}
+        if t is None:
+            self.acciones = self._reconstruir(inicial, blancos) + cola[1:]
+            pasos = len(self.acciones) - 1
+            self._medida_rendimiento.update(pasos=pasos, costo=pasos)
+
+    def _reconstruir(self, inicial: Tablero, blancos: List[int]) -> List[Tablero]:
+        """Rehace la ruta de tableros a partir de las posiciones del blanco."""
+        ruta = [inicial]
+        fichas = list(inicial.fichas)
+        for b, j in zip(blancos, blancos[1:]):
+            fichas[b], fichas[j] = fichas[j], 0
+            ruta.append(Tablero(self.N, tuple(fichas)))
+        return ruta
 
     def get_acciones(self):
         if hasattr(self, "acciones"):
@@ -64,13 +361,15 @@ class AgenteNPuzzle(AgenteBuscador):
         return None
 
     def get_medida_rendimiento(self):
-        if hasattr(self, "_medida_rendimiento"):
-            m = dict(self._medida_rendimiento)
-        elif hasattr(self, "medida"):
-            m = dict(self.medida)
-        else:
-            acciones = self.get_acciones()
-            pasos = (len(acciones) - 1) if acciones else 0
-            m = {"pasos": pasos, "costo": pasos, "operaciones": 0}
-        m["operaciones"] = max(int(m.get("operaciones", 0)), int(getattr(self, "_expandidos", 0)))
+        m = super().get_medida_rendimiento()
+        acciones = self.get_acciones()
+        pasos = (len(acciones) - 1) if acciones else 0
+        m.setdefault("pasos", pasos)
+        m.setdefault("costo", pasos)
+        if self.max_cache is not None:
+            m["desalojos_cache"] = self._desalojos_cache
+        if self._usar_cache:
+            m["aciertos_cache_soluciones"] = self.cache_soluciones.aciertos - self._aciertos_cache
+        # si la busqueda cuenta sus propias expansiones (mejor-primero, IDA*, ARA*, HDA*), esas mandan
+        m["operaciones"] = int(m["operaciones"] if "operaciones" in m else getattr(self, "_expandidos", 0))
         return m
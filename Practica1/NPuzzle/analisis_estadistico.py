@@ -1,4 +1,4 @@
-import argparse, csv, math
+import argparse, csv, math, time
 from collections import defaultdict
 
 def leer_csv(archivo):
@@ -55,38 +55,191 @@ def wilcoxon_approx(x, y):
     p = math.erfc(abs(z)/math.sqrt(2))
     return z, p, n
 
+def _fraccion_beta(a, b, x):
+    # Fraccion continua de la beta incompleta (metodo de Lentz)
+    tiny, eps = 1e-300, 1e-15
+    c, d = 1.0, 1.0 - (a + b) * x / (a + 1)
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    h = d
+    for m in range(1, 500):
+        for aa in (m * (b - m) * x / ((a + 2*m - 1) * (a + 2*m)),
+                   -(a + m) * (a + b + m) * x / ((a + 2*m) * (a + 2*m + 1))):
+            d = 1.0 + aa * d
+            d = 1.0 / (d if abs(d) > tiny else tiny)
+            c = 1.0 + aa / c
+            c = c if abs(c) > tiny else tiny
+            h *= d * c
+        if abs(d * c - 1.0) < eps:
+            break
+    return h
+
+def beta_incompleta(a, b, x):
+    """Beta incompleta regularizada I_x(a, b)."""
+    if x <= 0.0: return 0.0
+    if x >= 1.0: return 1.0
+    ln = (math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b)
+          + a * math.log(x) + b * math.log1p(-x))
+    if x < (a + 1) / (a + b + 2):
+        return math.exp(ln) * _fraccion_beta(a, b, x) / a
+    return 1.0 - math.exp(ln) * _fraccion_beta(b, a, 1.0 - x) / b
+
+def cdf_t_student(t, df):
+    """P(T <= t) para una t de Student con df grados de libertad."""
+    cola = 0.5 * beta_incompleta(df / 2.0, 0.5, df / (df + t*t))
+    return 1.0 - cola if t > 0 else cola
+
 def t_pareada(x, y):
-    try:
-        import statistics, math
-        n = len(x)
-        if n == 0: return 0.0, 1.0, 0
-        d = [a-b for a,b in zip(x,y)]
-        md = sum(d)/n
-        sd = statistics.pstdev(d) if n==1 else statistics.stdev(d)
-        if sd == 0: return 0.0, 1.0, n
-        t = md / (sd / math.sqrt(n))
-        try:
-            import mpmath as mp
-            df = n-1
-            p = 2*(1-mp.gammainc((df+1)/2, 0, (abs(t)**2)/ (df))/mp.gamma((df+1)/2))
-        except Exception:
-            p = 1.0
-        return t, float(p), n
-    except Exception:
+    import statistics
+    n = len(x)
+    if n == 0: return 0.0, 1.0, 0
+    d = [a-b for a,b in zip(x,y)]
+    md = sum(d)/n
+    sd = statistics.pstdev(d) if n==1 else statistics.stdev(d)
+    if sd == 0: return 0.0, 1.0, n
+    t = md / (sd / math.sqrt(n))
+    p = 2 * cdf_t_student(-abs(t), n-1) if n > 1 else 1.0
+    return t, p, n
+
+# --- Reporte de todos los pares (NumPy) ---
+
+def rangos_promedio(v):
+    """Rangos 1..n de v; los empates reciben el promedio de sus rangos."""
+    import numpy as np
+    orden = np.argsort(v, kind="mergesort")
+    ordenado = v[orden]
+    nuevo = np.r_[True, ordenado[1:] != ordenado[:-1]]
+    inicios = np.flatnonzero(nuevo)
+    fines = np.r_[inicios[1:], len(v)]
+    r = np.empty(len(v))
+    r[orden] = ((inicios + fines + 1) / 2.0)[np.cumsum(nuevo) - 1]
+    return r
+
+def wilcoxon_vectorizado(d):
+    """Igual que wilcoxon_approx pero sobre un arreglo de diferencias."""
+    import numpy as np
+    d = d[d != 0]
+    n = len(d)
+    if n == 0:
         return 0.0, 1.0, 0
+    Wpos = rangos_promedio(np.abs(d))[d > 0].sum()
+    mu = n*(n+1)/4.0
+    sigma = math.sqrt(n*(n+1)*(2*n+1)/24.0)
+    z = (Wpos - mu) / sigma if sigma > 0 else 0.0
+    return z, math.erfc(abs(z)/math.sqrt(2)), n
+
+def t_vectorizada(d):
+    n = len(d)
+    if n < 2:
+        return 0.0, 1.0, n
+    sd = d.std(ddof=1)
+    if sd == 0:
+        return 0.0, 1.0, n
+    t = d.mean() / (sd / math.sqrt(n))
+    return t, 2 * cdf_t_student(-abs(t), n-1), n
+
+def ic_bootstrap(d, rng, repeticiones=1000, nivel=0.95, lote=256):
+    """IC percentil de la media de d; los remuestreos se generan por lotes."""
+    import numpy as np
+    n = len(d)
+    if n == 0:
+        return float("nan"), float("nan")
+    medias = np.empty(repeticiones)
+    for i in range(0, repeticiones, lote):
+        m = min(lote, repeticiones - i)
+        medias[i:i+m] = d[rng.integers(0, n, size=(m, n))].mean(axis=1)
+    alfa = (1 - nivel) / 2
+    lo, hi = np.quantile(medias, [alfa, 1 - alfa])
+    return float(lo), float(hi)
+
+def holm(p):
+    """p-valores ajustados por Holm-Bonferroni."""
+    import numpy as np
+    p = np.asarray(p, dtype=float)
+    m = len(p)
+    orden = np.argsort(p, kind="mergesort")
+    ajustados = np.minimum(np.maximum.accumulate((m - np.arange(m)) * p[orden]), 1.0)
+    r = np.empty(m)
+    r[orden] = ajustados
+    return r
+
+def reporte(tabla, metricas, test="wilcoxon", repeticiones=1000, semilla=0, alfa=0.05):
+    """Todos los pares de heuristicas x tecnica x metrica, con Holm sobre el conjunto."""
+    import numpy as np
+    from itertools import combinations
+    rng = np.random.default_rng(semilla)
+    por_tecnica = defaultdict(list)
+    for tec, h in tabla.grupos():
+        por_tecnica[tec].append(h)
+    filas = []
+    for tec in sorted(por_tecnica):
+        for h1, h2 in combinations(sorted(por_tecnica[tec]), 2):
+            for metrica in metricas:
+                x, y = tabla.emparejar(tec, h1, h2, metrica)
+                d = x - y
+                z, p_w, _ = wilcoxon_vectorizado(d)
+                t, p_t, _ = t_vectorizada(d)
+                lo, hi = ic_bootstrap(d, rng, repeticiones)
+                filas.append({"tecnica": tec, "metrica": metrica, "h1": h1, "h2": h2,
+                              "n": len(d), "media_d": float(d.mean()) if len(d) else float("nan"),
+                              "ic_lo": lo, "ic_hi": hi, "z": z, "p_wilcoxon": p_w,
+                              "t": t, "p_t": p_t})
+    if filas:
+        ajustados = holm([f["p_wilcoxon" if test == "wilcoxon" else "p_t"] for f in filas])
+        for f, p in zip(filas, ajustados):
+            f["p_holm"] = float(p)
+            f["significativa"] = p < alfa
+    return filas
+
+def imprimir_reporte(filas, test, alfa=0.05):
+    print(f"{'tecnica':10s} {'metrica':9s} {'h1':10s} {'h2':10s} {'n':>6s} {'media(h1-h2)':>13s} "
+          f"{'IC95 bootstrap':>25s} {'z':>8s} {'p_wil':>9s} {'t':>8s} {'p_t':>9s} {'p_holm':>9s}")
+    for f in filas:
+        ic = f"[{f['ic_lo']:.4g}, {f['ic_hi']:.4g}]"
+        print(f"{f['tecnica']:10s} {f['metrica']:9s} {f['h1']:10s} {f['h2']:10s} {f['n']:6d} "
+              f"{f['media_d']:13.4g} {ic:>25s} {f['z']:8.2f} {f['p_wilcoxon']:9.2e} "
+              f"{f['t']:8.2f} {f['p_t']:9.2e} {f['p_holm']:9.2e}{' *' if f['significativa'] else ''}")
+    print(f"* significativa con Holm ({test}, α={alfa}) sobre {len(filas)} comparaciones.")
 
 def main():
     ap = argparse.ArgumentParser()
-    ap.add_argument("--archivo", default="resultados_npuzzle.csv")
-    ap.add_argument("--tecnica", choices=["codicioso","astar"], required=True)
-    ap.add_argument("--h1", choices=["fuera","manhattan","conflicto"], required=True)
-    ap.add_argument("--h2", choices=["fuera","manhattan","conflicto"], required=True)
+    ap.add_argument("--archivo", default="resultados_npuzzle.csv",
+                    help="CSV de experimento2 o su version columnar .res (resultados.py).")
+    ap.add_argument("--tecnica", choices=["codicioso","astar"])
+    ap.add_argument("--h1", choices=["fuera","manhattan","conflicto"])
+    ap.add_argument("--h2", choices=["fuera","manhattan","conflicto"])
     ap.add_argument("--metrica", choices=["nodos","tiempo_s","pasos"], default="nodos")
     ap.add_argument("--test", choices=["wilcoxon","tpareada"], default="wilcoxon")
+    ap.add_argument("--reporte", action="store_true",
+                    help="Todos los pares de heurísticas × técnica × métrica (requiere NumPy).")
+    ap.add_argument("--metricas", default="nodos,tiempo_s,pasos", help="Métricas del reporte.")
+    ap.add_argument("--bootstrap", type=int, default=1000, help="Remuestreos por comparación.")
+    ap.add_argument("--semilla", type=int, default=0)
     args = ap.parse_args()
 
-    filas = leer_csv(args.archivo)
-    x, y = emparejar(filas, args.tecnica, args.h1, args.h2, args.metrica)
+    if args.reporte:
+        from .resultados import TablaResultados
+        t0 = time.perf_counter()
+        tabla = (TablaResultados.cargar(args.archivo) if args.archivo.endswith(".res")
+                 else TablaResultados.desde_csv(args.archivo))
+        metricas = [m.strip() for m in args.metricas.split(",") if m.strip()]
+        for m in metricas:
+            if m not in tabla.columnas:
+                ap.error(f"métrica desconocida: {m}")
+        filas = reporte(tabla, metricas, args.test, args.bootstrap, args.semilla)
+        imprimir_reporte(filas, args.test)
+        print(f"({len(tabla)} filas, {time.perf_counter() - t0:.2f} s)")
+        return
+    if not (args.tecnica and args.h1 and args.h2):
+        ap.error("--tecnica, --h1 y --h2 son obligatorios sin --reporte")
+
+    if args.archivo.endswith(".res"):
+        # formato columnar (ver resultados.py): emparejar es un join de arreglos
+        from .resultados import TablaResultados
+        tabla = TablaResultados.cargar(args.archivo)
+        x, y = (v.tolist() for v in tabla.emparejar(args.tecnica, args.h1, args.h2, args.metrica))
+    else:
+        filas = leer_csv(args.archivo)
+        x, y = emparejar(filas, args.tecnica, args.h1, args.h2, args.metrica)
 
     if args.test == "tpareada":
         stat, p, n = t_pareada(x, y)
@@ -0,0 +1,175 @@
+"""Bases de datos de patrones (PDB) aditivas y disjuntas para el N-Puzzle.
+
+Cada patron es un subconjunto de fichas; su tabla guarda, para cada
+colocacion de esas fichas, el minimo de movimientos DE ESAS FICHAS hasta la
+meta (mover las demas cuesta 0), asi que las tablas de una particion
+disjunta se pueden sumar. Se construyen con un BFS 0-1 retrogrado desde la
+meta, se indexan por el rango de la permutacion parcial de posiciones y se
+guardan en disco como arreglos de bytes que luego se mapean en memoria.
+
+    python -m NPuzzle.bd_patrones --particion 663
+"""
+import argparse, mmap, os, struct
+from collections import deque
+from math import perm
+from time import perf_counter
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .tablero import Tablero, vecinos_blanco
+
+DIRECTORIO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pdbs")
+
+# nombre -> (N, patrones). 6-6-3 y 7-8 son las particiones de Korf & Felner;
+# la 7-8 necesita varios GB y horas de BFS en Python puro, por eso no se
+# registra en HEURISTICAS y hay que construirla explicitamente.
+PARTICIONES: Dict[str, Tuple[int, Tuple[Tuple[int, ...], ...]]] = {
+    "44":  (3, ((1, 2, 3, 4), (5, 6, 7, 8))),
+    "663": (4, ((1, 5, 6, 9, 10, 13), (7, 8, 11, 12, 14, 15), (2, 3, 4))),
+    "78":  (4, ((1, 2, 3, 4, 5, 6, 7), (8, 9, 10, 11, 12, 13, 14, 15))),
+}
+
+_CABECERA = struct.Struct("<4sBB")  # firma, N, fichas del patron
+_FIRMA = b"PDB1"
+_SIN_VALOR = 255
+
+def rango(posiciones: Sequence[int], n: int) -> int:
+    """Rango de Lehmer de una permutacion parcial de k casillas entre n."""
+    r, usados = 0, 0
+    for i, p in enumerate(posiciones):
+        r = r * (n - i) + (p - (usados & ((1 << p) - 1)).bit_count())
+        usados |= 1 << p
+    return r
+
+def posiciones_de(r: int, n: int, k: int) -> Tuple[int, ...]:
+    """Inversa de `rango`."""
+    digitos = []
+    for i in reversed(range(k)):
+        r, d = divmod(r, n - i)
+        digitos.append(d)
+    libres = list(range(n))
+    return tuple(libres.pop(d) for d in reversed(digitos))
+
+def construir(N: int, patron: Sequence[int]) -> bytearray:
+    """BFS 0-1 retrogrado desde la meta sobre (posiciones del patron, blanco)."""
+    n, k = N*N, len(patron)
+    vecinos = vecinos_blanco(N)
+    tabla = bytearray([_SIN_VALOR]) * perm(n, k)
+    visto = bytearray(perm(n, k) * n)
+    meta = tuple(f-1 for f in patron)
+    dq = deque([(meta, n-1, 0)])
+    while dq:
+        pos, b, d = dq.popleft()
+        r = rango(pos, n)
+        if visto[r*n + b]:
+            continue
+        visto[r*n + b] = 1
+        if d < tabla[r]:
+            tabla[r] = d
+        for j in vecinos[b]:
+            if j in pos:
+                # mover una ficha del patron: cuesta 1
+                i = pos.index(j)
+                nueva = pos[:i] + (b,) + pos[i+1:]
+                if not visto[rango(nueva, n)*n + j]:
+                    dq.append((nueva, j, d+1))
+            elif not visto[r*n + j]:
+                # mover otra ficha: cuesta 0
+                dq.appendleft((pos, j, d))
+    return tabla
+
+def ruta_archivo(N: int, patron: Sequence[int], directorio: str = DIRECTORIO) -> str:
+    return os.path.join(directorio, f"pdb_{N}_{'-'.join(map(str, patron))}.bin")
+
+def guardar(ruta: str, N: int, patron: Sequence[int], tabla: bytearray) -> None:
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    tmp = ruta + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(_CABECERA.pack(_FIRMA, N, len(patron)))
+        f.write(tabla)
+    os.replace(tmp, ruta)
+
+def cargar(ruta: str, N: int, patron: Sequence[int]) -> memoryview:
+    """Mapea la tabla en memoria (solo lectura) y valida la cabecera."""
+    with open(ruta, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    firma, n, k = _CABECERA.unpack_from(mm, 0)
+    if firma != _FIRMA or n != N or k != len(patron) or len(mm) != _CABECERA.size + perm(N*N, k):
+        raise ValueError(f"PDB inválida: {ruta}")
+    return memoryview(mm)[_CABECERA.size:]
+
+
+class HeuristicaPDB:
+    """h(t) = max(suma de PDBs sobre t, suma de PDBs sobre t transpuesto)."""
+
+    def __init__(self, N: int, patrones: Sequence[Sequence[int]],
+                 directorio: str = DIRECTORIO, espejo: bool = True):
+        fichas = sorted(f for p in patrones for f in p)
+        if len(set(fichas)) != len(fichas) or not set(fichas) <= set(range(1, N*N)):
+            raise ValueError("Los patrones deben ser disjuntos y con fichas 1..N²-1")
+        self.N = N
+        self.patrones = [tuple(p) for p in patrones]
+        self.directorio = directorio
+        self.espejo = espejo
+        self._tablas: List[memoryview] = []
+        # ficha -> ficha cuya meta es la casilla transpuesta
+        self._reflejo = [0] + [(f-1) % N * N + (f-1) // N + 1 for f in range(1, N*N)]
+        self._transpuesta = [(i % N) * N + i // N for i in range(N*N)]
+
+    def cargar(self, construir_si_falta: bool = True) -> "HeuristicaPDB":
+        if self._tablas:
+            return self
+        for p in self.patrones:
+            ruta = ruta_archivo(self.N, p, self.directorio)
+            if not os.path.exists(ruta):
+                if not construir_si_falta:
+                    raise FileNotFoundError(ruta)
+                print(f"Construyendo PDB {p} (N={self.N})...", flush=True)
+                guardar(ruta, self.N, p, construir(self.N, p))
+            self._tablas.append(cargar(ruta, self.N, p))
+        return self
+
+    def _sumar(self, donde: Sequence[int]) -> int:
+        n = self.N * self.N
+        return sum(tabla[rango([donde[f] for f in p], n)]
+                   for p, tabla in zip(self.patrones, self._tablas))
+
+    def __call__(self, t: Tablero, meta: Optional[Tablero] = None) -> int:
+        if t.N != self.N or len(t.fichas) != self.N * self.N:
+            raise ValueError(f"PDB para {self.N}x{self.N}, tablero de {t.N}x{t.columnas}")
+        if meta is not None and not meta.es_meta():
+            raise ValueError("Las PDBs solo valen para la meta estándar")
+        if not self._tablas:
+            self.cargar()
+        donde = [0] * (self.N * self.N)  # ficha -> casilla
+        for i, f in enumerate(t.fichas):
+            donde[f] = i
+        h = self._sumar(donde)
+        if self.espejo:
+            refl, tr = self._reflejo, self._transpuesta
+            espejado = [0] * len(donde)
+            for f, i in enumerate(donde):
+                espejado[refl[f]] = tr[i]
+            h = max(h, self._sumar(espejado))
+        return h
+
+
+def por_nombre(nombre: str) -> HeuristicaPDB:
+    N, patrones = PARTICIONES[nombre]
+    return HeuristicaPDB(N, patrones)
+
+def main():
+    ap = argparse.ArgumentParser(description="Construye las PDBs de una partición.")
+    ap.add_argument("--particion", choices=list(PARTICIONES), default="44")
+    ap.add_argument("--directorio", default=DIRECTORIO)
+    args = ap.parse_args()
+    N, patrones = PARTICIONES[args.particion]
+    for p in patrones:
+        t0 = perf_counter()
+        tabla = construir(N, p)
+        ruta = ruta_archivo(N, p, args.directorio)
+        guardar(ruta, N, p, tabla)
+        print(f"{p}: {len(tabla)} entradas, max={max(tabla)} "
+              f"({perf_counter()-t0:.1f} s) -> {ruta}", flush=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""Banco de pruebas reproducible sobre conjuntos fijos de instancias.
+
+Conjuntos incluidos (en instancias/):
+  - ocho:    50 tableros 3x3 uniformes entre los resolubles.
+  - quince:  25 tableros 4x4 a 30 movimientos de la meta.
+  - korf100: las 100 instancias de Korf (1985) del 15-puzzle.
+
+Cada par (tecnica, heuristica) se corre con calentamiento y repeticiones; se
+reportan tiempo por instancia (mediana de las repeticiones), nodos/s y pico
+de memoria (tracemalloc, en una corrida aparte sin medir tiempo). El
+resultado va a un JSON que puede compararse con una linea base:
+
+  python -m NPuzzle.benchmark --conjunto ocho --out base.json
+  python -m NPuzzle.benchmark --conjunto ocho --base base.json --umbral 0.10
+"""
+import argparse, json, os, platform, sys, time, tracemalloc
+from statistics import median
+from typing import Dict, List, Tuple
+
+from .tablero import Tablero
+from .heuristicas import HEURISTICAS
+from .agente_npuzzle import AgenteNPuzzle, OPTIMAS
+
+DIRECTORIO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "instancias")
+CONJUNTOS = {"ocho": 3, "quince": 4, "korf100": 4}
+
+
+def _girar(fichas: List[int]) -> Tuple[int, ...]:
+    """Meta con el blanco en 0 -> meta 1..n con el blanco al final (giro de 180 grados)."""
+    n = len(fichas)
+    return tuple(n - v if v else 0 for v in reversed(fichas))
+
+
+def cargar_conjunto(nombre: str, limite: int = None) -> List[Tuple[Tablero, int]]:
+    """Lista de (tablero, largo optimo) del conjunto `nombre`."""
+    if nombre not in CONJUNTOS:
+        raise ValueError(f"Conjunto desconocido: {nombre} (opciones: {', '.join(CONJUNTOS)})")
+    N = CONJUNTOS[nombre]
+    instancias = []
+    with open(os.path.join(DIRECTORIO, f"{nombre}.txt")) as f:
+        for linea in f:
+            if not linea.strip() or linea.startswith("#"):
+                continue
+            *fichas, optimo = map(int, linea.split())
+            if nombre == "korf100":
+                fichas = _girar(fichas)
+            instancias.append((Tablero(N, tuple(fichas)), optimo))
+    return instancias[:limite]
+
+
+def _resolver(N: int, tecnica: str, nombre_h: str, inicial: Tablero) -> AgenteNPuzzle:
+    ag = AgenteNPuzzle(N, heuristica=HEURISTICAS[nombre_h], tecnica=tecnica)
+    ag.fijar_estados(inicial, Tablero(N, tuple([*range(1, N*N), 0])))
+    ag.programa()
+    return ag
+
+
+def medir(N: int, tecnica: str, nombre_h: str, instancias, repeticiones: int = 3,
+          calentamiento: int = 1, memoria: bool = True) -> Dict:
+    """Corre una configuracion sobre todas las instancias y resume."""
+    for inicial, _ in instancias[:calentamiento]:
+        _resolver(N, tecnica, nombre_h, inicial)
+
+    tiempos, nodos, picos, optimas = [], [], [], 0
+    for inicial, optimo in instancias:
+        ts = []
+        for _ in range(repeticiones):
+            t0 = time.perf_counter()
+            ag = _resolver(N, tecnica, nombre_h, inicial)
+            ts.append(time.perf_counter() - t0)
+        m = ag.get_medida_rendimiento()
+        tiempos.append(median(ts))
+        nodos.append(m["expandidos"])
+        optimas += m["pasos"] == optimo
+        if memoria:
+            tracemalloc.start()
+            _resolver(N, tecnica, nombre_h, inicial)
+            picos.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+
+    total_t = sum(tiempos)
+    r = {
+        "instancias": len(instancias),
+        "tiempo_total_s": total_t,
+        "tiempo_medio_s": total_t / len(instancias),
+        "tiempo_por_instancia_s": tiempos,
+        "nodos": sum(nodos),
+        "nodos_por_s": sum(nodos) / total_t if total_t > 0 else 0.0,
+        "optimas": optimas,
+    }
+    if memoria:
+        r["pico_memoria_kb"] = max(picos) / 1024
+    if tecnica in OPTIMAS and optimas != len(instancias):
+        r["aviso"] = f"{len(instancias) - optimas} soluciones no optimas"
+    return r
+
+
+def comparar(actual: Dict, base: Dict, umbral: float) -> List[str]:
+    """Regresiones de `actual` respecto de `base` mayores que el umbral relativo."""
+    for campo in ("conjunto", "instancias"):
+        if actual["meta"][campo] != base["meta"][campo]:
+            raise ValueError(f"La linea base usa otro {campo}: {base['meta'][campo]} "
+                             f"(actual: {actual['meta'][campo]})")
+    regresiones = []
+    for clave, r in actual["resultados"].items():
+        b = base["resultados"].get(clave)
+        if b is None:
+            continue
+        for metrica, peor_si_sube in (("tiempo_medio_s", True), ("nodos", True),
+                                      ("pico_memoria_kb", True), ("nodos_por_s", False)):
+            if metrica not in r or metrica not in b or not b[metrica]:
+                continue
+            cambio = r[metrica] / b[metrica] - 1
+            if (cambio if peor_si_sube else -cambio) > umbral:
+                regresiones.append(f"{clave}: {metrica} {b[metrica]:.4g} -> {r[metrica]:.4g} "
+                                   f"({100*cambio:+.1f}%)")
+        if r["optimas"] < b["optimas"]:
+            regresiones.append(f"{clave}: optimas {b['optimas']} -> {r['optimas']}")
+    return regresiones
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--conjunto", choices=list(CONJUNTOS), default="ocho")
+    ap.add_argument("--limite", type=int, default=None, help="Usar solo las primeras instancias.")
+    ap.add_argument("--tecnicas", type=str, default="astar,idastar")
+    ap.add_argument("--heuristicas", type=str, default="manhattan,conflicto")
+    ap.add_argument("--repeticiones", type=int, default=3)
+    ap.add_argument("--calentamiento", type=int, default=1,
+                    help="Instancias resueltas antes de medir cada configuracion.")
+    ap.add_argument("--sin_memoria", action="store_true", help="No medir el pico de memoria.")
+    ap.add_argument("--out", type=str, default="benchmark.json")
+    ap.add_argument("--base", type=str, default=None, help="JSON de una corrida anterior.")
+    ap.add_argument("--umbral", type=float, default=0.10,
+                    help="Cambio relativo tolerado antes de marcar una regresion.")
+    args = ap.parse_args()
+
+    N = CONJUNTOS[args.conjunto]
+    instancias = cargar_conjunto(args.conjunto, args.limite)
+    tecnicas = [t.strip() for t in args.tecnicas.split(",") if t.strip()]
+    heuristicas = [h.strip() for h in args.heuristicas.split(",") if h.strip()]
+
+    salida = {
+        "meta": {"conjunto": args.conjunto, "instancias": len(instancias),
+                 "repeticiones": args.repeticiones, "calentamiento": args.calentamiento,
+                 "python": platform.python_version(), "plataforma": platform.platform(),
+                 "fecha": time.strftime("%Y-%m-%d %H:%M:%S")},
+        "resultados": {},
+    }
+    for tec in tecnicas:
+        for h in heuristicas:
+            if h not in HEURISTICAS:
+                print(f"[SKIP] Heurística desconocida: {h}", flush=True)
+                continue
+            r = medir(N, tec, h, instancias, args.repeticiones, args.calentamiento,
+                      not args.sin_memoria)
+            salida["resultados"][f"{tec}/{h}"] = r
+            mem = f" | mem={r['pico_memoria_kb']:.0f} KB" if "pico_memoria_kb" in r else ""
+            print(f"{tec:10s} | {h:10s} | t/inst={r['tiempo_medio_s']*1000:.2f} ms | "
+                  f"nodos/s={r['nodos_por_s']:.0f}{mem} | optimas={r['optimas']}/{r['instancias']}"
+                  + (f" | {r['aviso']}" if "aviso" in r else ""), flush=True)
+
+    with open(args.out, "w") as f:
+        json.dump(salida, f, indent=2)
+    print(f"\nJSON -> {args.out}", flush=True)
+
+    if args.base:
+        with open(args.base) as f:
+            base = json.load(f)
+        regresiones = comparar(salida, base, args.umbral)
+        if regresiones:
+            print(f"\n{len(regresiones)} regresiones (umbral {100*args.umbral:.0f}%):")
+            for r in regresiones:
+                print("  " + r)
+            sys.exit(1)
+        print(f"\nSin regresiones respecto de {args.base} (umbral {100*args.umbral:.0f}%).")
+
+
+if __name__ == "__main__":
+    main()
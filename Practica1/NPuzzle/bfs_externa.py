@@ -0,0 +1,215 @@
+"""BFS en memoria externa con deteccion de duplicados diferida (DDD).
+
+Cada capa del BFS vive en disco como un archivo de estados ordenados sin
+repetir (enteros de 64 bits, orden nativo). Para generar la capa d+1 se lee
+la capa d de corrido; los hijos se juntan en memoria hasta `memoria` estados,
+se ordenan y se vuelcan como corridas ordenadas; al terminar la capa se
+mezclan todas las corridas (k vias) y, en la misma pasada, se descartan los
+estados que ya estan en las capas d y d-1, que en un grafo no dirigido son
+las unicas donde puede reaparecer un hijo (Korf, 2008). Asi nunca hace falta
+un conjunto de visitados en RAM: solo el bufer de hijos y un bloque de lectura
+por archivo abierto.
+
+El motor solo conoce enteros y una funcion de sucesores, asi que sirve igual
+para estados de tablero que para estados abstractos de una PDB;
+`sucesores_npuzzle` da la codificacion del N-Puzzle (las fichas empaquetadas
+de compacto.py, sin el campo del blanco: 64 bits alcanzan hasta 4x4).
+
+    python -m NPuzzle.bfs_externa --N 3 --memoria 20000
+"""
+import argparse, heapq, os, shutil, tempfile
+from array import array
+from time import perf_counter
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .tablero import Tablero
+from .compacto import tabla_movimientos
+from .metas import meta_estandar
+
+_TIPO = "Q"  # un estado = un entero sin signo de 64 bits
+_BYTES = array(_TIPO).itemsize
+
+
+class BFSExterna:
+    """BFS por capas en disco sobre estados codificados como enteros de 64 bits."""
+
+    def __init__(self, sucesores: Callable[[int], Iterable[int]],
+                 directorio: Optional[str] = None, memoria: int = 1 << 20,
+                 bufer: int = 1 << 20, conservar_capas: bool = False):
+        if memoria < 1 or bufer < _BYTES:
+            raise ValueError("memoria y bufer deben ser positivos")
+        self.sucesores = sucesores
+        self.directorio = directorio      # None = carpeta temporal propia
+        self.memoria = memoria            # hijos en RAM antes de volcar una corrida
+        self.bufer = bufer - bufer % _BYTES  # bytes por lectura/escritura
+        self.conservar_capas = conservar_capas
+        self.bytes_leidos = 0
+        self.bytes_escritos = 0
+        self.capas: List[Dict] = []       # una entrada por capa (ver recorrer)
+
+    # --- E/S secuencial con bufer ---
+
+    def leer(self, ruta: str) -> Iterator[int]:
+        """Estados de un archivo de capa o corrida, en el orden en que estan."""
+        bloque = array(_TIPO)
+        with open(ruta, "rb", buffering=self.bufer) as f:
+            while datos := f.read(self.bufer):
+                self.bytes_leidos += len(datos)
+                bloque.frombytes(datos)
+                yield from bloque
+                del bloque[:]
+
+    def _escribir(self, ruta: str, estados: Iterable[int]) -> int:
+        """Escribe los estados en bloques de `bufer` bytes; devuelve cuantos fueron."""
+        por_bloque = self.bufer // _BYTES
+        bloque = array(_TIPO)
+        n = 0
+        with open(ruta, "wb", buffering=self.bufer) as f:
+            for e in estados:
+                bloque.append(e)
+                if len(bloque) == por_bloque:
+                    f.write(bloque)
+                    n += len(bloque)
+                    del bloque[:]
+            f.write(bloque)
+            n += len(bloque)
+        self.bytes_escritos += n * _BYTES
+        return n
+
+    # --- BFS ---
+
+    def _ruta_capa(self, d: int) -> str:
+        return os.path.join(self._dir, f"capa_{d:04d}.bin")
+
+    def _volcar(self, hijos: List[int], corridas: List[str]) -> None:
+        ruta = os.path.join(self._dir, f"corrida_{len(corridas):05d}.bin")
+        self._escribir(ruta, sorted(set(hijos)))
+        corridas.append(ruta)
+        hijos.clear()
+
+    def _nuevos(self, corridas: List[str], previas: List[str]) -> Iterator[int]:
+        # mezcla k vias de las corridas, sin repetidos y sin lo que ya esta en
+        # las capas previas (tambien ordenadas): un solo recorrido de cada archivo
+        ultimo = None
+        anteriores = [self.leer(r) for r in previas]
+        cabezas = [next(it, None) for it in anteriores]
+        for e in heapq.merge(*(self.leer(r) for r in corridas)):
+            if e == ultimo:
+                continue
+            ultimo = e
+            visto = False
+            for i, it in enumerate(anteriores):
+                while cabezas[i] is not None and cabezas[i] < e:
+                    cabezas[i] = next(it, None)
+                visto = visto or cabezas[i] == e
+            if not visto:
+                yield e
+
+    def recorrer(self, iniciales: Iterable[int],
+                 max_profundidad: Optional[int] = None) -> Iterator[Tuple[int, str]]:
+        """Genera (profundidad, ruta del archivo de la capa) capa por capa.
+
+        El archivo de la capa d sigue en disco hasta generar la capa d+2, asi
+        que quien consuma el generador puede leerlo con `leer` antes de pedir
+        la siguiente. Las estadisticas de cada capa quedan en `capas`.
+        """
+        propio = self.directorio is None
+        self._dir = tempfile.mkdtemp(prefix="bfs_") if propio else self.directorio
+        os.makedirs(self._dir, exist_ok=True)
+        self.capas = []
+        try:
+            d, corridas = 0, 0
+            ruta = self._ruta_capa(0)
+            leidos, escritos, t0 = self.bytes_leidos, self.bytes_escritos, perf_counter()
+            n = self._escribir(ruta, sorted(set(iniciales)))
+            previas = [ruta]
+            while n:
+                self.capas.append({"profundidad": d, "estados": n, "corridas": corridas,
+                                   "bytes_leidos": self.bytes_leidos - leidos,
+                                   "bytes_escritos": self.bytes_escritos - escritos,
+                                   "tiempo_s": perf_counter() - t0})
+                yield d, ruta
+                if max_profundidad is not None and d >= max_profundidad:
+                    break
+                leidos, escritos, t0 = self.bytes_leidos, self.bytes_escritos, perf_counter()
+                hijos: List[int] = []
+                lista: List[str] = []
+                for e in self.leer(ruta):
+                    hijos.extend(self.sucesores(e))
+                    if len(hijos) >= self.memoria:
+                        self._volcar(hijos, lista)
+                if hijos:
+                    self._volcar(hijos, lista)
+                corridas = len(lista)
+                d += 1
+                ruta = self._ruta_capa(d)
+                n = self._escribir(ruta, self._nuevos(lista, previas))
+                for r in lista:
+                    os.remove(r)
+                previas = previas[-1:] + [ruta]
+                if d >= 2 and not self.conservar_capas:
+                    os.remove(self._ruta_capa(d - 2))
+            if not n and not self.conservar_capas:
+                os.remove(ruta)  # la capa vacia del final
+        finally:
+            if propio and not self.conservar_capas:
+                shutil.rmtree(self._dir, ignore_errors=True)
+
+
+def sucesores_npuzzle(N: int, C: Optional[int] = None) -> Tuple[Callable[[int], List[int]],
+                                                                Callable[[Tablero], int],
+                                                                Callable[[int], Tablero]]:
+    """(sucesores, codificar, decodificar) de tableros N x C en enteros de 64 bits."""
+    tabla = tabla_movimientos(N, C)
+    b, n = tabla.b, N * tabla.C
+    if b * n > 64:
+        raise ValueError(f"Un tablero {N}x{tabla.C} no entra en 64 bits")
+    mascara = tabla.mascara
+    desplazamiento = [s - b for s in tabla.desplazamiento]
+
+    def blanco(x):
+        for i, s in enumerate(desplazamiento):
+            if not (x >> s) & mascara:
+                return i
+        raise ValueError("Estado sin blanco")
+
+    def sucesores(x):
+        return [h >> b for h in tabla.sucesores((x << b) | blanco(x))]
+
+    def codificar(t):
+        return tabla.empaquetar(t.fichas) >> b
+
+    def decodificar(x):
+        return Tablero(N, tabla.fichas(x << b))
+
+    return sucesores, codificar, decodificar
+
+
+def main():
+    ap = argparse.ArgumentParser(description="BFS en disco por capas desde la meta del N-Puzzle.")
+    ap.add_argument("--N", type=int, default=3)
+    ap.add_argument("--columnas", type=int, default=None)
+    ap.add_argument("--memoria", type=int, default=1 << 20,
+                    help="Hijos en RAM antes de volcar una corrida ordenada.")
+    ap.add_argument("--bufer", type=int, default=1 << 20, help="Bytes por lectura/escritura.")
+    ap.add_argument("--max_profundidad", type=int, default=None)
+    ap.add_argument("--directorio", default=None,
+                    help="Carpeta para capas y corridas (por defecto una temporal).")
+    args = ap.parse_args()
+
+    sucesores, codificar, _ = sucesores_npuzzle(args.N, args.columnas)
+    meta = Tablero(args.N, meta_estandar(args.N, args.columnas))
+    bfs = BFSExterna(sucesores, args.directorio, args.memoria, args.bufer)
+    t0 = perf_counter()
+    total = 0
+    for d, _ in bfs.recorrer([codificar(meta)], args.max_profundidad):
+        c = bfs.capas[-1]
+        total += c["estados"]
+        print(f"capa {d:3d} | {c['estados']:>12,} estados | {c['corridas']:4d} corridas | "
+              f"leidos {c['bytes_leidos']/2**20:9.1f} MiB | escritos {c['bytes_escritos']/2**20:9.1f} MiB | "
+              f"{c['tiempo_s']:.1f} s", flush=True)
+    print(f"total {total:,} estados en {len(bfs.capas)} capas | leidos {bfs.bytes_leidos/2**20:.1f} MiB, "
+          f"escritos {bfs.bytes_escritos/2**20:.1f} MiB | {perf_counter()-t0:.1f} s")
+
+if __name__ == "__main__":
+    main()
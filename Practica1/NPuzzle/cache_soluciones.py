@@ -0,0 +1,151 @@
+"""Cache persistente de distancias exactas a la meta, compartida entre busquedas.
+
+Para cada estado de una ruta optima ya resuelta guarda su distancia a la
+meta y el mejor movimiento (la casilla a la que va el blanco). Es una tabla
+en disco mapeada en memoria, asociativa por cubetas de 4 ranuras: la clave
+es el tablero empaquetado sin el campo del blanco (64 bits alcanzan hasta
+4x4) y, si la cubeta esta llena, se desaloja la ranura usada hace mas tiempo.
+
+Las distancias solo valen para la meta 1..N²-1 con el blanco al final.
+"""
+import mmap, os, struct
+from typing import List, Optional, Tuple
+
+from .tablero import Tablero
+from .compacto import bits_por_ficha, empaquetar
+
+_CABECERA = struct.Struct("<4sBxxxII")  # firma, N, cubetas, reloj
+_FIRMA = b"SOL1"
+_RANURA = struct.Struct("<QBBxxI")      # clave, distancia, movimiento, ultimo uso
+_POR_CUBETA = 4
+_SIN_MOVIMIENTO = 255                    # la meta no tiene mejor movimiento
+DIRECTORIO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pdbs")
+
+def ruta_por_defecto(N: int) -> str:
+    return os.path.join(DIRECTORIO, f"soluciones_{N}.bin")
+
+
+class CacheSoluciones:
+    """Tabla clave -> (distancia, movimiento) con tope de `capacidad` ranuras."""
+
+    def __init__(self, ruta: str, N: int, capacidad: int = 1 << 20):
+        if N * N * bits_por_ficha(N) > 64:
+            raise ValueError(f"CacheSoluciones admite tableros hasta 4x4 (N={N})")
+        self.ruta = ruta
+        self.N = N
+        self._b = bits_por_ficha(N)
+        self.aciertos = self.fallos = self.desalojos = 0
+        if not os.path.exists(ruta):
+            cubetas = 1 << max(0, (max(capacidad, _POR_CUBETA) // _POR_CUBETA - 1).bit_length())
+            os.makedirs(os.path.dirname(os.path.abspath(ruta)), exist_ok=True)
+            with open(ruta, "wb") as f:
+                f.write(_CABECERA.pack(_FIRMA, N, cubetas, 0))
+                f.truncate(_CABECERA.size + cubetas * _POR_CUBETA * _RANURA.size)
+        with open(ruta, "r+b") as f:
+            self._mm = mmap.mmap(f.fileno(), 0)
+        firma, n, self.cubetas, self._reloj = _CABECERA.unpack_from(self._mm, 0)
+        if (firma != _FIRMA or n != N or self.cubetas & (self.cubetas - 1)
+                or len(self._mm) != _CABECERA.size + self.cubetas * _POR_CUBETA * _RANURA.size):
+            self._mm.close()
+            raise ValueError(f"Cache de soluciones inválida para N={N}: {ruta}")
+        self._bits = self.cubetas.bit_length() - 1
+
+    @property
+    def capacidad(self) -> int:
+        return self.cubetas * _POR_CUBETA
+
+    def clave(self, t) -> int:
+        """Tablero (o int empaquetado) -> clave de 64 bits."""
+        p = empaquetar(t) if isinstance(t, Tablero) else t
+        return p >> self._b
+
+    def _inicio(self, clave: int) -> int:
+        # finalizador de splitmix64: las claves difieren en pocos bits
+        z = (clave ^ (clave >> 30)) * 0xBF58476D1CE4E5B9 & 0xFFFFFFFFFFFFFFFF
+        z = (z ^ (z >> 27)) * 0x94D049BB133111EB & 0xFFFFFFFFFFFFFFFF
+        z ^= z >> 31
+        cubeta = z >> (64 - self._bits) if self._bits else 0
+        return _CABECERA.size + cubeta * _POR_CUBETA * _RANURA.size
+
+    def buscar(self, t) -> Optional[Tuple[int, int]]:
+        """(distancia, movimiento) del tablero o None si no esta."""
+        clave = self.clave(t)
+        pos = self._inicio(clave)
+        for i in range(_POR_CUBETA):
+            k, d, mov, _ = _RANURA.unpack_from(self._mm, pos + i * _RANURA.size)
+            if k == clave:
+                self.aciertos += 1
+                return d, mov
+        self.fallos += 1
+        return None
+
+    def distancia(self, t) -> Optional[int]:
+        r = self.buscar(t)
+        return None if r is None else r[0]
+
+    def _escribir(self, clave: int, distancia: int, movimiento: int) -> None:
+        pos = self._inicio(clave)
+        destino, mas_viejo = None, None
+        for i in range(_POR_CUBETA):
+            p = pos + i * _RANURA.size
+            k, d, mov, uso = _RANURA.unpack_from(self._mm, p)
+            if k == clave:
+                if d <= distancia:  # ya estaba: solo se renueva el uso
+                    _RANURA.pack_into(self._mm, p, k, d, mov, self._reloj)
+                    return
+                destino = p
+                break
+            if k == 0:
+                if destino is None:
+                    destino = p
+                continue
+            if mas_viejo is None or uso < mas_viejo[0]:
+                mas_viejo = (uso, p)
+        if destino is None:
+            destino = mas_viejo[1]
+            self.desalojos += 1
+        _RANURA.pack_into(self._mm, destino, clave, distancia, movimiento, self._reloj)
+
+    def guardar_ruta(self, ruta: List[Tablero]) -> None:
+        """Registra los estados de una ruta OPTIMA que termina en la meta."""
+        if not ruta:
+            return
+        self._reloj += 1
+        for i, t in enumerate(ruta):
+            mov = ruta[i + 1].fichas.index(0) if i + 1 < len(ruta) else _SIN_MOVIMIENTO
+            self._escribir(self.clave(t), len(ruta) - 1 - i, mov)
+        _CABECERA.pack_into(self._mm, 0, _FIRMA, self.N, self.cubetas, self._reloj)
+
+    def ruta_desde(self, t: Tablero) -> Optional[List[Tablero]]:
+        """Ruta optima desde t siguiendo los mejores movimientos guardados."""
+        r = self.buscar(t)
+        if r is None:
+            return None
+        ruta, fichas = [t], list(t.fichas)
+        d, mov = r
+        while d > 0:
+            b = fichas.index(0)
+            fichas[b], fichas[mov] = fichas[mov], 0
+            ruta.append(Tablero(self.N, tuple(fichas)))
+            r = self.buscar(ruta[-1])
+            if r is None or r[0] != d - 1:
+                return None  # la cadena se corto por un desalojo
+            d, mov = r
+        return ruta
+
+    def __len__(self) -> int:
+        ocupadas = 0
+        for i in range(self.capacidad):
+            if _RANURA.unpack_from(self._mm, _CABECERA.size + i * _RANURA.size)[0]:
+                ocupadas += 1
+        return ocupadas
+
+    def cerrar(self) -> None:
+        self._mm.flush()
+        self._mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
@@ -0,0 +1,87 @@
+from collections import abc
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple
+
+from .tablero import Tablero, vecinos_blanco
+
+# Representacion empaquetada: un solo int con un campo de `b` bits por casilla
+# (4 bits hasta 4x4, mas para N mayores) y el indice del blanco en los `b` bits
+# bajos. La casilla 0 ocupa el campo mas alto, asi que el orden de los enteros
+# coincide con el orden lexicografico de las tuplas de fichas de Tablero.
+
+def bits_por_ficha(N: int, C: Optional[int] = None) -> int:
+    return max(4, (N*(C or N) - 1).bit_length())
+
+
+class TablaMovimientos:
+    """Tablas precalculadas por forma N x C: desplazamientos y vecinos de cada blanco."""
+
+    def __init__(self, N: int, C: Optional[int] = None):
+        self.N = N
+        self.C = C = C or N
+        n = N*C
+        self.b = b = bits_por_ficha(N, C)
+        self.mascara = (1 << b) - 1
+        self.desplazamiento = tuple(b*(n - i) for i in range(n))
+        # para cada blanco: (destino, desplazamiento destino)
+        self.vecinos = tuple(tuple((j, self.desplazamiento[j]) for j in vs)
+                             for vs in vecinos_blanco(N, C))
+
+    def empaquetar(self, fichas: Sequence[int]) -> int:
+        p = 0
+        for f in fichas:
+            p = (p << self.b) | f
+        return (p << self.b) | list(fichas).index(0)
+
+    def fichas(self, p: int) -> Tuple[int, ...]:
+        m = self.mascara
+        return tuple((p >> s) & m for s in self.desplazamiento)
+
+    def blanco(self, p: int) -> int:
+        return p & self.mascara
+
+    def movimientos(self, p: int) -> List[Tuple[int, int, int, int]]:
+        """(hijo, ficha, desde, hasta) para cada ficha que puede ir al hueco."""
+        m = self.mascara
+        b = p & m
+        sb = self.desplazamiento[b]
+        res = []
+        for j, sj in self.vecinos[b]:
+            ficha = (p >> sj) & m
+            hijo = p - (ficha << sj) + (ficha << sb) - b + j
+            res.append((hijo, ficha, j, b))
+        return res
+
+    def sucesores(self, p: int) -> List[int]:
+        return [hijo for hijo, _, _, _ in self.movimientos(p)]
+
+
+class FichasCompactas(abc.Sequence):
+    """Vista de solo lectura de las fichas de un int empaquetado (sin copiarlas)."""
+
+    __slots__ = ("p", "tabla")
+
+    def __init__(self, p: int, tabla: TablaMovimientos):
+        self.p = p
+        self.tabla = tabla
+
+    def __len__(self):
+        return len(self.tabla.desplazamiento)
+
+    def __getitem__(self, i):
+        t = self.tabla
+        if isinstance(i, slice):
+            return [(self.p >> t.desplazamiento[k]) & t.mascara
+                    for k in range(*i.indices(len(self)))]
+        return (self.p >> t.desplazamiento[i]) & t.mascara
+
+
+@lru_cache(maxsize=None)
+def tabla_movimientos(N: int, C: Optional[int] = None) -> TablaMovimientos:
+    return TablaMovimientos(N, C)
+
+def empaquetar(t: Tablero) -> int:
+    return tabla_movimientos(t.N, t.columnas).empaquetar(t.fichas)
+
+def desempaquetar(p: int, N: int, C: Optional[int] = None) -> Tablero:
+    return Tablero(N, tabla_movimientos(N, C).fichas(p))
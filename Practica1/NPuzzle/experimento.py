@@ -62,7 +62,7 @@ def main():
     parser.add_argument("--k", type=int, default=100, help="Cantidad de instancias por combo (sug: 100 al probar)")
     parser.add_argument("--semilla", type=int, default=7)
     parser.add_argument("--tecnicas", type=str, default="codicioso,astar",
-                        help="Lista separada por comas (opciones: codicioso,astar)")
+                        help="Lista separada por comas (opciones: codicioso,astar,idastar)")
     parser.add_argument("--heuristicas", type=str, default="fuera,manhattan,conflicto",
                         help="Lista separada por comas (fuera, manhattan, conflicto)")
     args = parser.parse_args()
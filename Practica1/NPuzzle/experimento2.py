@@ -1,10 +1,15 @@
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
 from time import perf_counter
-from statistics import mean
-import argparse, csv, sys
+import argparse, csv, os
 
-from .tablero import Tablero, mezclar_aleatorio, es_resoluble
+from AgenteIA.Estadisticas import Estadisticas
+from .tablero import Tablero, mezclar_aleatorio, es_resoluble, generar_instancias
 from .heuristicas import HEURISTICAS
-from .agente_npuzzle import AgenteNPuzzle
+from .agente_npuzzle import AgenteNPuzzle, OPTIMAS
+from .cache_soluciones import CacheSoluciones
+from .tabla_perfecta import TablaPerfecta
 
 def factor_ramificacion_efectivo(nodos: int, profundidad: int) -> float:
     if profundidad <= 0: return 0.0
@@ -19,54 +24,209 @@ def factor_ramificacion_efectivo(nodos: int, profundidad: int) -> float:
         else: lo = mid
     return (lo+hi)/2
 
-def ejecutar_solvedor(N: int, pasos_mezcla: int, tecnica: str, nombre_h: str,
-                      k: int, semilla: int):
+CAMPOS = ["instancia","tecnica","heuristica","N","mezcla","pasos","tiempo_s","nodos",
+          *Estadisticas.CONTADORES, *Estadisticas.TIEMPOS]
+
+GENERADORES = ["mezcla", "caminata", "uniforme"]
+
+@lru_cache(maxsize=4)
+def _lote(N: int, pasos_mezcla: int, k: int, semilla: int, metodo: str):
+    # Cada proceso regenera el mismo lote a partir de la semilla
+    return generar_instancias(N, k, pasos=pasos_mezcla, semilla=semilla, metodo=metodo)
+
+def instancia(N: int, pasos_mezcla: int, i: int, semilla: int,
+              generador: str = "mezcla", k: int = 0) -> Tablero:
+    """Instancia i del experimento; deterministica dada la semilla."""
+    if generador != "mezcla":
+        return _lote(N, pasos_mezcla, k, semilla, generador)[i]
+    s = mezclar_aleatorio(N, pasos=pasos_mezcla, semilla=semilla+i)
+    if not es_resoluble(s):
+        s = mezclar_aleatorio(N, pasos=pasos_mezcla+1, semilla=semilla+i+999)
+    return s
+
+@lru_cache(maxsize=None)
+def _cache_soluciones(ruta: str, N: int) -> CacheSoluciones:
+    return CacheSoluciones(ruta, N)
+
+@lru_cache(maxsize=None)
+def _tabla_perfecta(N: int) -> TablaPerfecta:
+    return TablaPerfecta(N).cargar()
+
+def resolver_instancia(N: int, pasos_mezcla: int, tecnica: str, nombre_h: str,
+                       i: int, semilla: int, generador: str = "mezcla", k: int = 0,
+                       cache: str = None, verificar: bool = False):
+    """Resuelve la instancia i (semilla propia, reproducible en cualquier proceso)."""
     meta = Tablero(N, tuple([*range(1, N*N), 0]))
-    hfun = HEURISTICAS[nombre_h]
-    pasos, tiempos, nodos, fallas = [], [], [], 0
-    filas = []
+    s = instancia(N, pasos_mezcla, i, semilla, generador, k)
+
+    ag = AgenteNPuzzle(N, heuristica=HEURISTICAS[nombre_h], tecnica=tecnica,
+                       cache_soluciones=_cache_soluciones(cache, N) if cache else None)
+    ag.fijar_estados(s, meta)
+
+    t0 = perf_counter(); ag.programa(); dt = perf_counter() - t0
+
+    acc = ag.get_acciones()
+    metr = ag.get_medida_rendimiento()
+    if verificar and acc:
+        # ValueError si la ruta es ilegal o, en tecnicas optimas, no es minima
+        _tabla_perfecta(N).verificar(acc, optima=tecnica in OPTIMAS)
+
+    if acc and s != meta and metr:
+        return {
+            "instancia": i,
+            "tecnica": tecnica,
+            "heuristica": nombre_h,
+            "N": N,
+            "mezcla": pasos_mezcla,
+            "pasos": metr.get("pasos", len(acc)-1),
+            "tiempo_s": dt,
+            "nodos": metr.get("operaciones", 0),
+            **{c: metr[c] for c in Estadisticas.CONTADORES + Estadisticas.TIEMPOS},
+        }
+    return None
+
+def _resolver_tarea(tarea):
+    return resolver_instancia(*tarea)
+
+def clave_fila(fila):
+    """(instancia, tecnica, heuristica, N, mezcla) con los tipos de resolver_instancia."""
+    return (int(fila["instancia"]), fila["tecnica"], fila["heuristica"],
+            int(fila["N"]), int(fila["mezcla"]))
+
+def abrir_salida(ruta: str, reanudar: bool):
+    """Abre el CSV para agregar filas; devuelve (archivo, writer, claves ya resueltas).
+
+    Al reanudar se descarta una ultima linea incompleta (corte a mitad de
+    escritura) y se exige el mismo encabezado.
+    """
+    hechos = set()
+    if reanudar and os.path.exists(ruta) and os.path.getsize(ruta) > 0:
+        with open(ruta, "rb+") as f:
+            datos = f.read()
+            if not datos.endswith(b"\n"):
+                f.truncate(datos.rfind(b"\n") + 1)
+        with open(ruta, newline="") as f:
+            lector = csv.DictReader(f)
+            if lector.fieldnames != CAMPOS:
+                raise ValueError(f"{ruta} tiene otras columnas; no se puede reanudar")
+            hechos = {clave_fila(fila) for fila in lector}
+        f = open(ruta, "a", newline="")
+        w = csv.DictWriter(f, fieldnames=CAMPOS)
+    else:
+        f = open(ruta, "w", newline="")
+        w = csv.DictWriter(f, fieldnames=CAMPOS)
+        w.writeheader(); f.flush()
+    return f, w, hechos
+
+class Acumulado:
+    """Sumas por configuracion para promediar sin guardar las filas."""
 
+    def __init__(self):
+        self.n = 0
+        self.pasos = self.tiempo_s = self.nodos = 0.0
+
+    def agregar(self, fila):
+        self.n += 1
+        self.pasos += float(fila["pasos"])
+        self.tiempo_s += float(fila["tiempo_s"])
+        self.nodos += float(fila["nodos"])
+
+def resumir(tecnica: str, nombre_h: str, acc: Acumulado, fallas: int):
+    if acc.n:
+        prom_p, prom_t, prom_n = acc.pasos / acc.n, acc.tiempo_s / acc.n, acc.nodos / acc.n
+        b = factor_ramificacion_efectivo(int(prom_n), int(prom_p))
+    else:
+        prom_p = prom_t = prom_n = b = float("inf")
+    return {"tecnica": tecnica, "heuristica": nombre_h, "pasos": prom_p,
+            "tiempo_s": prom_t, "nodos": prom_n, "b*": b, "incompletos": fallas}
+
+def resumir_csv(ruta: str, N: int, pasos_mezcla: int, k: int, configs):
+    """Resumen por configuracion leyendo el CSV fila a fila.
+
+    Las instancias sin fila (fallidas o pendientes) cuentan como incompletas.
+    """
+    accs = {c: Acumulado() for c in configs}
+    with open(ruta, newline="") as f:
+        for fila in csv.DictReader(f):
+            c = (fila["tecnica"], fila["heuristica"])
+            if c in accs and int(fila["N"]) == N and int(fila["mezcla"]) == pasos_mezcla \
+                    and int(fila["instancia"]) < k:
+                accs[c].agregar(fila)
+    return [resumir(tec, h, acc, k - acc.n) for (tec, h), acc in accs.items()]
+
+def ejecutar_solvedor(N: int, pasos_mezcla: int, tecnica: str, nombre_h: str,
+                      k: int, semilla: int, generador: str = "mezcla",
+                      escribir=None, hechos=frozenset(), cache: str = None,
+                      verificar: bool = False):
+    """Resuelve las k instancias de una configuracion, salteando las de `hechos`.
+
+    Cada fila se pasa a `escribir` apenas se obtiene; el resumen devuelto
+    cubre solo las instancias resueltas en esta llamada.
+    """
+    acc, fallas, omitidas = Acumulado(), 0, 0
     for i in range(k):
-        s = mezclar_aleatorio(N, pasos=pasos_mezcla, semilla=semilla+i)
-        if not es_resoluble(s):
-            s = mezclar_aleatorio(N, pasos=pasos_mezcla+1, semilla=semilla+i+999)
-
-        ag = AgenteNPuzzle(N, heuristica=hfun, tecnica=tecnica)
-        ag.fijar_estados(s, meta)
-
-        t0 = perf_counter(); ag.programa(); dt = perf_counter() - t0
-
-        acc = ag.get_acciones()
-        metr = ag.get_medida_rendimiento()
-
-        if acc and s != meta and metr:
-            p = metr.get("pasos", len(acc)-1)
-            n = metr.get("operaciones", 0)
-            t = dt
-            pasos.append(p); tiempos.append(t); nodos.append(n)
-            filas.append({
-                "instancia": i,
-                "tecnica": tecnica,
-                "heuristica": nombre_h,
-                "N": N,
-                "mezcla": pasos_mezcla,
-                "pasos": p,
-                "tiempo_s": t,
-                "nodos": n
-            })
+        if (i, tecnica, nombre_h, N, pasos_mezcla) in hechos:
+            omitidas += 1
+            continue
+        fila = resolver_instancia(N, pasos_mezcla, tecnica, nombre_h, i, semilla, generador, k,
+                                  cache, verificar)
+        if fila is not None:
+            acc.agregar(fila)
+            if escribir is not None:
+                escribir(fila)
         else:
             fallas += 1
 
         if (i+1) % max(1, k//10) == 0:
             print(f"  [{tecnica}/{nombre_h}] {i+1}/{k} instancias...", flush=True)
 
-    prom_p = mean(pasos) if pasos else float("inf")
-    prom_t = mean(tiempos) if tiempos else float("inf")
-    prom_n = mean(nodos) if nodos else float("inf")
-    b = factor_ramificacion_efectivo(int(prom_n), int(prom_p)) if pasos else float("inf")
-    resumen = {"tecnica": tecnica, "heuristica": nombre_h, "pasos": prom_p,
-               "tiempo_s": prom_t, "nodos": prom_n, "b*": b, "incompletos": fallas}
-    return resumen, filas
+    if omitidas:
+        print(f"  [{tecnica}/{nombre_h}] {omitidas} instancias ya estaban en el CSV", flush=True)
+    return resumir(tecnica, nombre_h, acc, fallas)
+
+def imprimir_resumen(r):
+    print(f"{r['tecnica']:10s} | {r['heuristica']:10s} | pasos={r['pasos']:.2f} | "
+          f"t={r['tiempo_s']*1000:.1f} ms | nodos={r['nodos']:.1f} | b*={r['b*']:.3f} | "
+          f"incompletos={r['incompletos']}", flush=True)
+
+def ejecutar_paralelo(N: int, pasos_mezcla: int, configs, k: int, semilla: int,
+                      workers: int, escribir, generador: str = "mezcla",
+                      hechos=frozenset(), verificar: bool = False) -> int:
+    """Reparte la grilla (instancia, tecnica, heuristica) en un pool de procesos.
+
+    Cada fila se escribe apenas termina su tarea (en orden de llegada, no de
+    envio): una instancia lenta no retiene las ya resueltas y, si la corrida
+    se corta, --resume solo repite lo que de verdad faltaba.
+    """
+    tareas = [(N, pasos_mezcla, tec, h, i, semilla, generador, k, None, verificar)
+              for tec, h in configs for i in range(k)
+              if (i, tec, h, N, pasos_mezcla) not in hechos]
+    total = len(tareas)
+    if not total:
+        return 0
+    pendientes = Counter((t[2], t[3]) for t in tareas)
+    accs = {c: Acumulado() for c in pendientes}
+    fallas = Counter()
+    escritas = 0
+    t0 = perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futuros = {pool.submit(_resolver_tarea, t): (t[2], t[3]) for t in tareas}
+        for n, futuro in enumerate(as_completed(futuros), 1):
+            config = futuros.pop(futuro)
+            fila = futuro.result()
+            if fila is not None:
+                escribir(fila)
+                accs[config].agregar(fila); escritas += 1
+            else:
+                fallas[config] += 1
+            pendientes[config] -= 1
+            if not pendientes[config]:  # termino una configuracion (tecnica, heuristica)
+                imprimir_resumen(resumir(*config, accs.pop(config), fallas[config]))
+            if n % max(1, total // 20) == 0 or n == total:
+                dt = perf_counter() - t0
+                print(f"  [{workers} procesos] {n}/{total} instancias "
+                      f"({100*n/total:.0f}%, {n/dt:.1f} inst/s)", flush=True)
+    return escritas
 
 def main():
     parser = argparse.ArgumentParser()
@@ -77,34 +237,63 @@ def main():
     parser.add_argument("--out", type=str, default="resultados_npuzzle.csv")
     parser.add_argument("--tecnicas", type=str, default="codicioso,astar")
     parser.add_argument("--heuristicas", type=str, default="fuera,manhattan,conflicto")
+    parser.add_argument("--generador", choices=GENERADORES, default="mezcla",
+                        help="mezcla: una caminata por semilla+i; caminata/uniforme: lote generado de una vez.")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Procesos en paralelo (1 = ejecución serial).")
+    parser.add_argument("--cache", type=str, default=None, metavar="RUTA",
+                        help="Caché persistente de soluciones compartida entre instancias (solo serial).")
+    parser.add_argument("--verificar", action="store_true",
+                        help="Comprobar cada ruta contra la tabla perfecta (N<=3; óptimo en técnicas óptimas).")
+    parser.add_argument("--resume", action="store_true",
+                        help="Agregar al CSV existente salteando las instancias ya resueltas.")
+    parser.add_argument("--solo_resumen", action="store_true",
+                        help="No resolver nada; solo resumir el CSV existente.")
     args = parser.parse_args()
+    if args.cache and args.workers > 1:
+        parser.error("--cache no admite escrituras concurrentes; usar --workers 1")
+    if args.verificar and args.N > 3:
+        parser.error("--verificar usa la tabla perfecta, disponible solo para N <= 3")
 
     tecnicas = [t.strip() for t in args.tecnicas.split(",") if t.strip()]
     heuristicas = [h.strip() for h in args.heuristicas.split(",") if h.strip()]
 
-    print("=== RESUMEN ===", flush=True)
-
-    todos = []
+    configs = []
     for tec in tecnicas:
         for h in heuristicas:
             if h not in HEURISTICAS:
                 print(f"[SKIP] Heurística desconocida: {h}", flush=True)
                 continue
-            print(f"\n> Ejecutando {tec} × {h}  (N={args.N}, mezcla={args.mezcla}, k={args.k})", flush=True)
-            r, filas = ejecutar_solvedor(args.N, args.mezcla, tec, h, k=args.k, semilla=args.semilla)
-            print(f"{r['tecnica']:10s} | {r['heuristica']:10s} | pasos={r['pasos']:.2f} | "
-                  f"t={r['tiempo_s']*1000:.1f} ms | nodos={r['nodos']:.1f} | b*={r['b*']:.3f} | "
-                  f"incompletos={r['incompletos']}", flush=True)
-            todos.extend(filas)
-
-    if todos:
-        with open(args.out, "w", newline="") as f:
-            campos = ["instancia","tecnica","heuristica","N","mezcla","pasos","tiempo_s","nodos"]
-            w = csv.DictWriter(f, fieldnames=campos)
-            w.writeheader(); w.writerows(todos)
-        print(f"\nCSV -> {args.out}", flush=True)
-    else:
-        print("\nSin filas para escribir CSV.", flush=True)
+            configs.append((tec, h))
+
+    if not args.solo_resumen:
+        f, w, hechos = abrir_salida(args.out, args.resume)
+
+        def escribir(fila):
+            w.writerow(fila); f.flush()
+
+        with f:
+            if hechos:
+                print(f"Reanudando {args.out}: {len(hechos)} filas ya escritas", flush=True)
+            if args.workers > 1:
+                print(f"\n> Ejecutando {len(configs)} configuraciones en {args.workers} procesos "
+                      f"(N={args.N}, mezcla={args.mezcla}, k={args.k})", flush=True)
+                escritas = ejecutar_paralelo(args.N, args.mezcla, configs, args.k, args.semilla,
+                                             args.workers, escribir, args.generador, hechos,
+                                             args.verificar)
+                print(f"\nCSV -> {args.out} ({escritas} filas nuevas)", flush=True)
+            else:
+                for tec, h in configs:
+                    print(f"\n> Ejecutando {tec} × {h}  (N={args.N}, mezcla={args.mezcla}, k={args.k})", flush=True)
+                    r = ejecutar_solvedor(args.N, args.mezcla, tec, h, k=args.k, semilla=args.semilla,
+                                          generador=args.generador, escribir=escribir, hechos=hechos,
+                                          cache=args.cache, verificar=args.verificar)
+                    imprimir_resumen(r)
+                print(f"\nCSV -> {args.out}", flush=True)
+
+    print("\n=== RESUMEN (desde el CSV) ===", flush=True)
+    for r in resumir_csv(args.out, args.N, args.mezcla, args.k, configs):
+        imprimir_resumen(r)
 
 if __name__ == "__main__":
     main()
@@ -1,34 +1,111 @@
+from typing import Optional, Sequence
 from .tablero import Tablero
+from .metas import TablaMeta, tabla_meta
+from .bd_patrones import por_nombre
+from .tabla_perfecta import TablaPerfecta
 
-def h_fuera_de_lugar(t: Tablero) -> int:
-    meta = [*range(1, t.N*t.N), 0]
-    return sum(1 for i, f in enumerate(t.fichas) if f and f != meta[i])
+# Todas reciben el tablero y, opcionalmente, la meta (por defecto la
+# estandar de su forma); las posiciones meta salen de una TablaMeta
+# precalculada por (forma, meta) en lugar de recalcularse con divmod.
 
-def h_manhattan(t: Tablero) -> int:
-    return sum(t.manhattan_de_ficha(f) for f in t.fichas if f)
+def _tabla(t: Tablero, meta: Optional[Tablero]) -> TablaMeta:
+    return tabla_meta(t.N, t.columnas, None if meta is None else meta.fichas)
 
-def h_conflicto_lineal(t: Tablero) -> int:
-    N = t.N
-    man = h_manhattan(t)
+def h_fuera_de_lugar(t: Tablero, meta: Optional[Tablero] = None) -> int:
+    objetivo = _tabla(t, meta).meta
+    return sum(1 for f, g in zip(t.fichas, objetivo) if f and f != g)
+
+def h_manhattan(t: Tablero, meta: Optional[Tablero] = None) -> int:
+    d = _tabla(t, meta).distancia
+    return sum(d[f][i] for i, f in enumerate(t.fichas))
+
+# Versiones respecto de un tablero objetivo cualquiera (p. ej. el inicial,
+# para el sentido de vuelta de la busqueda bidireccional)
+
+def h_fuera_hacia(t: Tablero, objetivo: Tablero) -> int:
+    return h_fuera_de_lugar(t, objetivo)
+
+def h_manhattan_hacia(t: Tablero, objetivo: Tablero) -> int:
+    return h_manhattan(t, objetivo)
+
+def _inversiones(orden: Sequence[int]) -> int:
+    cl = 0
+    for i in range(len(orden)):
+        for j in range(i+1, len(orden)):
+            cl += orden[i] > orden[j]
+    return cl
+
+def _conflictos_fila(fila: Sequence[int], r: int, m: TablaMeta) -> int:
+    # fichas cuya fila meta es r, ordenadas por su posicion actual
+    filas_meta, cols_meta = m.fila, m.columna
+    return _inversiones([cols_meta[f] for f in fila if f and filas_meta[f] == r])
+
+def _conflictos_columna(col: Sequence[int], c: int, m: TablaMeta) -> int:
+    filas_meta, cols_meta = m.fila, m.columna
+    return _inversiones([filas_meta[f] for f in col if f and cols_meta[f] == c])
+
+def h_conflicto_lineal(t: Tablero, meta: Optional[Tablero] = None) -> int:
+    m = _tabla(t, meta)
+    R, C = m.R, m.C
+    man = h_manhattan(t, meta)
     cl = 0
     # filas
-    for r in range(N):
-        fila = [t.fichas[r*N+c] for c in range(N)]
-        cols_meta = [(f-1)%N for f in fila if f and (f-1)//N == r]
-        for i in range(len(cols_meta)):
-            for j in range(i+1, len(cols_meta)):
-                cl += cols_meta[i] > cols_meta[j]
+    for r in range(R):
+        cl += _conflictos_fila(t.fichas[r*C:(r+1)*C], r, m)
     # columnas
-    for c in range(N):
-        col = [t.fichas[r*N+c] for r in range(N)]
-        filas_meta = [(f-1)//N for f in col if f and (f-1)%N == c]
-        for i in range(len(filas_meta)):
-            for j in range(i+1, len(filas_meta)):
-                cl += filas_meta[i] > filas_meta[j]
+    for c in range(C):
+        cl += _conflictos_columna(t.fichas[c::C], c, m)
     return man + 2*cl
 
+# --- Evaluacion incremental ---------------------------------------------------
+# Cada delta recibe las fichas del HIJO, la TablaMeta de la busqueda, el h
+# del padre y el movimiento (ficha que se desliza de `desde` a `hasta`) y
+# devuelve el h del hijo.
+
+def delta_fuera_de_lugar(fichas: Sequence[int], m: TablaMeta, h: int,
+                         ficha: int, desde: int, hasta: int) -> int:
+    return h - (ficha != m.meta[desde]) + (ficha != m.meta[hasta])
+
+def delta_manhattan(fichas: Sequence[int], m: TablaMeta, h: int,
+                    ficha: int, desde: int, hasta: int) -> int:
+    d = m.distancia[ficha]
+    return h - d[desde] + d[hasta]
+
+def delta_conflicto_lineal(fichas: Sequence[int], m: TablaMeta, h: int,
+                           ficha: int, desde: int, hasta: int) -> int:
+    h = delta_manhattan(fichas, m, h, ficha, desde, hasta)
+    C = m.C
+    (r0, c0), (r1, c1) = divmod(desde, C), divmod(hasta, C)
+    if r0 == r1:
+        # movimiento horizontal: solo cambian las columnas c0 y c1
+        antes0 = list(fichas[c0::C]); antes0[r0] = ficha
+        antes1 = list(fichas[c1::C]); antes1[r1] = 0
+        antes = _conflictos_columna(antes0, c0, m) + _conflictos_columna(antes1, c1, m)
+        ahora = _conflictos_columna(fichas[c0::C], c0, m) + _conflictos_columna(fichas[c1::C], c1, m)
+    else:
+        # movimiento vertical: solo cambian las filas r0 y r1
+        antes0 = list(fichas[r0*C:(r0+1)*C]); antes0[c0] = ficha
+        antes1 = list(fichas[r1*C:(r1+1)*C]); antes1[c1] = 0
+        antes = _conflictos_fila(antes0, r0, m) + _conflictos_fila(antes1, r1, m)
+        ahora = (_conflictos_fila(fichas[r0*C:(r0+1)*C], r0, m)
+                 + _conflictos_fila(fichas[r1*C:(r1+1)*C], r1, m))
+    return h + 2*(ahora - antes)
+
 HEURISTICAS = {
     "fuera": h_fuera_de_lugar,
     "manhattan": h_manhattan,
     "conflicto": h_conflicto_lineal,
+    # Solo para la meta estandar de tableros cuadrados:
+    # PDBs aditivas (se construyen/mapean la primera vez que se usan)
+    "pdb44": por_nombre("44"),    # 3x3
+    "pdb663": por_nombre("663"),  # 4x4
+    # distancia exacta de la tabla completa del 8-puzzle (h = h*)
+    "exacta": TablaPerfecta(3),
+}
+
+# Heuristica completa -> version incremental
+INCREMENTALES = {
+    h_fuera_de_lugar: delta_fuera_de_lugar,
+    h_manhattan: delta_manhattan,
+    h_conflicto_lineal: delta_conflicto_lineal,
 }
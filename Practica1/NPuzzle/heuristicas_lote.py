@@ -0,0 +1,79 @@
+"""Heuristicas vectorizadas con NumPy sobre lotes de tableros.
+
+Cada kernel recibe un arreglo entero (K, R*C) -con una fila de fichas por
+tablero- y, como la version escalar de `heuristicas.py`, una meta opcional
+(un Tablero; su forma fija R x C). Sin meta se usa la estandar de N filas
+(por defecto cuadrada). Devuelve K valores identicos a los escalares, con
+las mismas TablaMeta, y sin bucles de Python sobre los tableros.
+"""
+from functools import lru_cache
+from typing import Callable, Optional, Tuple
+
+import numpy as np
+
+from .tablero import Tablero
+from .metas import tabla_meta
+from .heuristicas import HEURISTICAS
+
+@lru_cache(maxsize=64)
+def _tablas(R: int, C: int, meta: Optional[Tuple[int, ...]]):
+    """Arreglos de la TablaMeta de (forma, meta): fila/columna meta por ficha,
+    distancia[f, i] y ficha meta por casilla."""
+    m = tabla_meta(R, C, meta)
+    return (np.array(m.fila), np.array(m.columna), np.array(m.distancia), np.array(m.meta))
+
+def _como_lote(tableros, meta: Optional[Tablero] = None,
+               N: Optional[int] = None) -> Tuple[np.ndarray, int, int, Optional[Tuple[int, ...]]]:
+    # forma R x C: la de la meta si se da, si no N filas (por defecto cuadrado)
+    B = np.asarray(tableros)
+    if B.ndim != 2:
+        raise ValueError(f"Se espera un arreglo (K, R*C), no {B.shape}")
+    n = B.shape[1]
+    if meta is not None:
+        R, C = meta.N, meta.columnas
+    elif N is not None:
+        R, C = N, n // N
+    else:
+        R = C = int(round(n ** 0.5))
+    if R*C != n:
+        raise ValueError(f"{n} columnas no forman un tablero de {R}x{C}")
+    return B, R, C, None if meta is None else tuple(meta.fichas)
+
+def h_fuera_de_lugar_lote(tableros, meta: Optional[Tablero] = None, N: Optional[int] = None) -> np.ndarray:
+    B, R, C, m = _como_lote(tableros, meta, N)
+    objetivo = _tablas(R, C, m)[3]
+    return ((B != objetivo) & (B != 0)).sum(axis=1)
+
+def h_manhattan_lote(tableros, meta: Optional[Tablero] = None, N: Optional[int] = None) -> np.ndarray:
+    B, R, C, m = _como_lote(tableros, meta, N)
+    distancia = _tablas(R, C, m)[2]
+    return distancia[B, np.arange(R*C)].sum(axis=1)
+
+def _conflictos_lineas(lineas: np.ndarray, linea_meta: np.ndarray,
+                       orden_meta: np.ndarray) -> np.ndarray:
+    # lineas: (K, L, M) -> [tablero, linea, posicion en la linea]
+    L, M = lineas.shape[1:]
+    propias = (lineas != 0) & (linea_meta[lineas] == np.arange(L)[:, None])
+    orden = orden_meta[lineas]
+    invertidos = orden[..., :, None] > orden[..., None, :]
+    ambos = propias[..., :, None] & propias[..., None, :]
+    i_menor_j = np.triu(np.ones((M, M), dtype=bool), k=1)  # pares (i, j) con i < j
+    return (invertidos & ambos & i_menor_j).sum(axis=(1, 2, 3))
+
+def h_conflicto_lineal_lote(tableros, meta: Optional[Tablero] = None, N: Optional[int] = None) -> np.ndarray:
+    B, R, C, m = _como_lote(tableros, meta, N)
+    fila_meta, col_meta, _, _ = _tablas(R, C, m)
+    filas = B.reshape(-1, R, C)
+    cl = (_conflictos_lineas(filas, fila_meta, col_meta)
+          + _conflictos_lineas(filas.transpose(0, 2, 1), col_meta, fila_meta))
+    return h_manhattan_lote(B, meta, N) + 2*cl
+
+HEURISTICAS_LOTE = {
+    "fuera": h_fuera_de_lugar_lote,
+    "manhattan": h_manhattan_lote,
+    "conflicto": h_conflicto_lineal_lote,
+}
+
+def obtener(nombre: str) -> Tuple[Callable, Optional[Callable]]:
+    """(version escalar de HEURISTICAS, version por lotes o None si no existe)."""
+    return HEURISTICAS[nombre], HEURISTICAS_LOTE.get(nombre)
@@ -1,15 +1,20 @@
-import sys, pygame
+import sys, threading, pygame
 from time import perf_counter
 from typing import Optional, List
 from NPuzzle.tablero import Tablero, mezclar_aleatorio
 from NPuzzle.heuristicas import HEURISTICAS
 from NPuzzle.agente_npuzzle import AgenteNPuzzle
+from NPuzzle.cache_soluciones import CacheSoluciones, ruta_por_defecto
+from NPuzzle.tiempo_real import EntornoNPuzzle
+from AgenteIA.Estadisticas import BusquedaCancelada
 
 N = 3
 M = 16
 TILE = 124
 TOPBAR_H = 56
 PANEL_H = 170
+TECNICAS = ["astar", "codicioso", "lrta"]
+PRESUPUESTO_MS = 8.0   # planificacion por movimiento en 'lrta': deja margen en un cuadro de 16 ms
 W, H = N * TILE + 2 * M, TOPBAR_H + N * TILE + 2 * M + PANEL_H
 
 BG = (246, 248, 250)
@@ -78,7 +83,7 @@ def click_move(t: Tablero, mx, my) -> Tablero:
         return Tablero(N, tuple(arr))
     return t
 
-def draw_panel(heur, tec, solving, steps_left, stats):
+def draw_panel(heur, tec, solving, steps_left, stats, busqueda=None):
     y0 = TOPBAR_H + N * TILE + M
     #rounded_rect(pygame.Rect(M, y0, W - 2 * M, PANEL_H - M), CARD, radius=18, border_color=BORDER)
     draw_text("Controles", (M + 18, y0 + 14), font, SUBT)
@@ -92,14 +97,32 @@ def draw_panel(heur, tec, solving, steps_left, stats):
     x += 220
     btns["tec"] = pygame.Rect(x, y, 210, chip_h); draw_chip(f"Técnica: {tec}", btns["tec"])
     x += 220
-    btns["resolver"] = pygame.Rect(x, y, 150, chip_h); draw_chip("Resolver (Espacio)", btns["resolver"], active=True)
+    jugando = solving and stats is not None and "latencia_ms" in stats
+    if busqueda is None and not jugando:
+        btns["resolver"] = pygame.Rect(x, y, 150, chip_h); draw_chip("Resolver (Espacio)", btns["resolver"], active=True)
+    else:
+        btns["resolver"] = pygame.Rect(x, y, 150, chip_h); draw_chip("Cancelar (C)", btns["resolver"])
 
     y2 = y + chip_h + 18
     draw_text("Clic en fichas adyacentes al hueco para mover. Esc para salir.", (M + 18, y2), font_small, SUBT)
 
     y3 = y2 + 28
-    draw_text("Métricas última resolución", (M + 18, y3), font, SUBT)
     y4 = y3 + 8 + 24
+    if stats and "latencia_ms" in stats:
+        draw_text("Tiempo real" + (" (jugando)" if solving else ""), (M + 18, y3), font, SUBT)
+        draw_text(f"Pasos: {stats['pasos']}", (M + 18, y4))
+        draw_text(f"Latencia: {stats['latencia_ms']:.1f} ms", (M + 180, y4))
+        draw_text(f"Máx: {stats['latencia_max_ms']:.1f} ms", (M + 400, y4))
+        if stats.get("estado"):
+            draw_text(stats["estado"], (M + 560, y4), color=SUBT)
+        return btns
+    if busqueda is not None:
+        p = busqueda.progreso()
+        draw_text("Buscando...", (M + 18, y3), font, SUBT)
+        draw_text(f"Nodos: {p['nodos']}", (M + 18, y4))
+        draw_text(f"Tiempo: {p['tiempo_ms']:.0f} ms", (M + 180, y4))
+        return btns
+    draw_text("Métricas última resolución", (M + 18, y3), font, SUBT)
     if stats:
         s1 = f"Pasos: {stats.get('pasos','-')}"
         s2 = f"Nodos: {stats.get('nodos','-')}"
@@ -107,6 +130,8 @@ def draw_panel(heur, tec, solving, steps_left, stats):
         draw_text(s1, (M + 18, y4))
         draw_text(s2, (M + 180, y4))
         draw_text(s3, (M + 340, y4))
+        if stats.get("estado"):
+            draw_text(stats["estado"], (M + 500, y4), color=SUBT)
     else:
         draw_text("— aún sin resolver —", (M + 18, y4), color=SUBT)
     return btns
@@ -114,20 +139,94 @@ def draw_panel(heur, tec, solving, steps_left, stats):
 def cycle(seq, cur):
     i = seq.index(cur); return seq[(i + 1) % len(seq)]
 
-def solve(tablero, heur_name, tec):
+_cache = None
+
+def cache_soluciones():
+    # Una sola cache en disco para todas las resoluciones de la sesion
+    global _cache
+    if _cache is None:
+        _cache = CacheSoluciones(ruta_por_defecto(N), N)
+    return _cache
+
+def _agente(tablero, heur_name, tec):
     meta = Tablero(N, tuple([*range(1, N * N), 0]))
-    ag = AgenteNPuzzle(N, HEURISTICAS[heur_name], tec)
+    ag = AgenteNPuzzle(N, HEURISTICAS[heur_name], tec, cache_soluciones=cache_soluciones(),
+                       presupuesto_ms=PRESUPUESTO_MS)
     ag.fijar_estados(tablero, meta)
-    t0 = perf_counter(); ag.programa(); dt = (perf_counter() - t0) * 1000
-    ruta = ag.get_acciones() or []
+    return ag
+
+def _partida(tablero, heur_name, tec):
+    # Agente de tiempo real: el entorno le pide un movimiento por cuadro de animacion
+    ag = _agente(tablero, heur_name, tec)
+    entorno = EntornoNPuzzle(tablero, ag.estado_meta, max_movimientos=2000)
+    entorno.insertar(ag)
+    return entorno
+
+def _metricas(ag, ruta, dt):
     metr = ag.get_medida_rendimiento() or {}
     pasos = metr.get("pasos", max(0, len(ruta) - 1))
     nodos = metr.get("operaciones", 0)
-    stats = {"pasos": pasos, "nodos": int(nodos), "tiempo_ms": round(dt, 1)}
-    return ruta, stats
+    return {"pasos": pasos, "nodos": int(nodos), "tiempo_ms": round(dt, 1)}
+
+def solve(tablero, heur_name, tec):
+    ag = _agente(tablero, heur_name, tec)
+    t0 = perf_counter(); ag.programa(); dt = (perf_counter() - t0) * 1000
+    ruta = ag.get_acciones() or []
+    return ruta, _metricas(ag, ruta, dt)
+
+
+class Resolucion:
+    """Busqueda en un hilo aparte; el bucle de cuadros consulta progreso() y terminada().
+
+    Las busquedas se serializan con un cerrojo para que una cancelada que aun
+    no llego a su proxima expansion no escriba la cache de soluciones junto
+    con la siguiente. La ventana solo lee los contadores de ag.estadisticas,
+    que se actualizan en cada expansion.
+    """
+
+    _cerrojo = threading.Lock()
+
+    def __init__(self, tablero, heur_name, tec):
+        self.tablero = tablero
+        self.agente = _agente(tablero, heur_name, tec)
+        self.ruta: Optional[List[Tablero]] = None
+        self.stats = None
+        self.error: Optional[Exception] = None
+        self.cancelada = False
+        self.t0 = perf_counter()
+        self._hilo = threading.Thread(target=self._correr, daemon=True)
+        self._hilo.start()
+
+    def _correr(self):
+        try:
+            with Resolucion._cerrojo:
+                self.t0 = perf_counter()
+                self.agente.programa()
+        except BusquedaCancelada:
+            self.cancelada = True
+            return
+        except Exception as e:  # se muestra en el panel en lugar de matar el hilo en silencio
+            self.error = e
+            return
+        dt = (perf_counter() - self.t0) * 1000
+        self.ruta = self.agente.get_acciones() or []
+        self.stats = _metricas(self.agente, self.ruta, dt)
+
+    def terminada(self) -> bool:
+        return not self._hilo.is_alive()
+
+    def progreso(self):
+        return {"nodos": self.agente.estadisticas.expandidos,
+                "tiempo_ms": (perf_counter() - self.t0) * 1000}
+
+    def cancelar(self):
+        self.agente.cancelar()
+
+    def esperar(self, timeout=None):
+        self._hilo.join(timeout)
 
 def main():
-    heur_names = ["manhattan", "conflicto", "fuera"]
+    heur_names = ["manhattan", "conflicto", "fuera", "pdb44", "exacta"]
     heur = heur_names[0]
     tec = "astar"
     tablero = mezclar_aleatorio(N, pasos=40, semilla=None)
@@ -137,41 +236,111 @@ def main():
     next_tick = 0
     solving = False
     stats = None
+    busqueda: Optional[Resolucion] = None
+    partida: Optional[EntornoNPuzzle] = None
+
+    def cancelar():
+        # Se descarta el resultado; el hilo termina en su proxima expansion
+        nonlocal busqueda, partida, stats, solving
+        if partida is not None:
+            partida, solving = None, False
+            stats = {**stats, "estado": "cancelada"}
+        if busqueda is not None:
+            busqueda.cancelar()
+            p = busqueda.progreso()
+            stats = {"pasos": "-", "nodos": p["nodos"], "tiempo_ms": round(p["tiempo_ms"], 1),
+                     "estado": "cancelada"}
+            busqueda = None
+
+    def resolver():
+        nonlocal busqueda, partida, ruta, idx, solving, stats, next_tick
+        cancelar()
+        ruta, idx, solving = None, 0, False
+        if tec == "lrta":
+            partida = _partida(tablero, heur, tec)
+            solving = partida.agentes[0].esta_habilitado()
+            stats = {"pasos": 0, "latencia_ms": 0.0, "latencia_max_ms": 0.0,
+                     "estado": "" if solving else "meta"}
+            next_tick = pygame.time.get_ticks()
+        else:
+            busqueda = Resolucion(tablero, heur, tec)
+
+    def mezclar():
+        nonlocal tablero, ruta, idx, solving, stats
+        cancelar()
+        tablero = mezclar_aleatorio(N, pasos=40, semilla=None)
+        ruta, idx, solving, stats = None, 0, False, None
 
     while True:
         dt = clock.tick(60)
         now = pygame.time.get_ticks()
         for e in pygame.event.get():
             if e.type == pygame.QUIT:
-                pygame.quit(); sys.exit(0)
-            if e.type == pygame.KEYDOWN and not solving:
-                if e.key == pygame.K_ESCAPE: pygame.quit(); sys.exit(0)
+                cancelar(); pygame.quit(); sys.exit(0)
+            if e.type == pygame.KEYDOWN:
+                if e.key == pygame.K_ESCAPE:
+                    if busqueda is not None or partida is not None:
+                        cancelar()
+                    else:
+                        pygame.quit(); sys.exit(0)
+                if e.key == pygame.K_c:
+                    cancelar()
+                if solving:
+                    continue
                 if e.key == pygame.K_r:
-                    tablero = mezclar_aleatorio(N, pasos=40, semilla=None)
-                    ruta, idx, solving, stats = None, 0, False, None
+                    mezclar()
                 if e.key == pygame.K_h:
                     heur = cycle(heur_names, heur)
                 if e.key == pygame.K_t:
-                    tec = "codicioso" if tec == "astar" else "astar"
+                    tec = cycle(TECNICAS, tec)
                 if e.key == pygame.K_SPACE:
-                    ruta, stats = solve(tablero, heur, tec)
-                    if ruta and len(ruta) > 1:
-                        idx = 0; solving = True; next_tick = now + anim_ms
+                    resolver()
             if e.type == pygame.MOUSEBUTTONDOWN and e.button == 1:
-                btns = draw_panel(heur, tec, solving, 0, stats)  # layout actual
-                if not solving and btns["mezclar"].collidepoint(e.pos):
-                    tablero = mezclar_aleatorio(N, pasos=40, semilla=None)
-                    ruta, idx, solving, stats = None, 0, False, None
-                elif not solving and btns["heur"].collidepoint(e.pos):
+                btns = draw_panel(heur, tec, solving, 0, stats, busqueda)  # layout actual
+                if partida is not None and btns["resolver"].collidepoint(e.pos):
+                    cancelar()
+                    continue
+                if solving:
+                    continue
+                if btns["mezclar"].collidepoint(e.pos):
+                    mezclar()
+                elif btns["heur"].collidepoint(e.pos):
                     heur = cycle(heur_names, heur)
-                elif not solving and btns["tec"].collidepoint(e.pos):
-                    tec = "codicioso" if tec == "astar" else "astar"
-                elif not solving and btns["resolver"].collidepoint(e.pos):
-                    ruta, stats = solve(tablero, heur, tec)
-                    if ruta and len(ruta) > 1:
-                        idx = 0; solving = True; next_tick = now + anim_ms
-                elif not solving:
-                    tablero = click_move(tablero, *e.pos)
+                elif btns["tec"].collidepoint(e.pos):
+                    tec = cycle(TECNICAS, tec)
+                elif btns["resolver"].collidepoint(e.pos):
+                    if busqueda is not None:
+                        cancelar()
+                    else:
+                        resolver()
+                else:
+                    nuevo = click_move(tablero, *e.pos)
+                    if nuevo != tablero:
+                        cancelar()  # la ruta en curso ya no sirve para este tablero
+                        tablero = nuevo
+
+        if busqueda is not None and busqueda.terminada():
+            if busqueda.error is not None:
+                stats = {"pasos": "-", "nodos": "-", "tiempo_ms": "-",
+                         "estado": f"error: {busqueda.error}"}
+            else:
+                ruta, stats = busqueda.ruta, busqueda.stats
+                if ruta and len(ruta) > 1:
+                    idx = 0; solving = True; next_tick = now + anim_ms
+            busqueda = None
+
+        if partida is not None and now >= next_tick:
+            # un movimiento por tick: el agente planifica a lo sumo PRESUPUESTO_MS
+            ag = partida.agentes[0]
+            partida.avanzar()
+            tablero = partida.tablero
+            lat = ag.latencias_ms
+            stats = {"pasos": len(partida.ruta) - 1, "latencia_ms": lat[-1] if lat else 0.0,
+                     "latencia_max_ms": max(lat, default=0.0), "estado": ""}
+            next_tick = now + anim_ms
+            if not ag.esta_habilitado():
+                stats["estado"] = "meta" if partida.llego() else "sin llegar"
+                partida, solving = None, False
 
         if solving and ruta:
             if now >= next_tick:
@@ -185,7 +354,7 @@ def main():
         draw_topbar()
         draw_board(tablero)
         steps_left = 0 if not ruta else max(0, len(ruta) - 1 - idx)
-        btns = draw_panel(heur, tec, solving, steps_left, stats)
+        btns = draw_panel(heur, tec, solving, steps_left, stats, busqueda)
         pygame.display.flip()
 
 if __name__ == "__main__":
@@ -1,37 +1,43 @@
 import argparse
 from time import perf_counter
 
-from NPuzzle.tablero import Tablero, mezclar_aleatorio
+from NPuzzle.tablero import Tablero, mezclar_aleatorio, es_resoluble
+from NPuzzle.metas import meta_estandar
 from NPuzzle.heuristicas import HEURISTICAS
 from NPuzzle.agente_npuzzle import AgenteNPuzzle
+from NPuzzle.cache_soluciones import CacheSoluciones
 
 def imprimir_tablero(t: Tablero):
-    N = t.N
-    w = len(str(N*N-1))
-    for r in range(N):
-        fila = t.fichas[r*N:(r+1)*N]
+    C = t.columnas
+    w = len(str(len(t.fichas)-1))
+    for r in range(t.N):
+        fila = t.fichas[r*C:(r+1)*C]
         print(" ".join(("·" if x == 0 else str(x)).rjust(w) for x in fila))
     print()
 
-def parsear_estado(txt: str, N: int) -> Tablero:
+def parsear_estado(txt: str, N: int, C: int = None) -> Tablero:
     """
-    Formato esperado (con o sin comas/espacios):
+    Formato esperado (con o sin comas/espacios), por filas:
       '1 2 3 4 5 6 7 8 0'   (N=3)
       '1,2,3,4,5,6,7,8,0'
     """
     tokens = [int(x) for x in txt.replace(",", " ").split()]
-    esperado = N*N
+    esperado = N*(C or N)
     if len(tokens) != esperado or set(tokens) != set(range(esperado)):
         raise ValueError(f"Estado inválido. Debe contener 0..{esperado-1}.")
     return Tablero(N, tuple(tokens))
 
 def main():
     parser = argparse.ArgumentParser(
-        description="Resolver N-Puzzle con A* o Codicioso usando heurísticas clásicas."
+        description="Resolver N-Puzzle con A*, IDA* o Codicioso usando heurísticas clásicas."
     )
     parser.add_argument("--N", type=int, default=3, help="Tamaño (3=8-puzzle, 4=15-puzzle).")
-    parser.add_argument("--tecnica", choices=["astar", "codicioso"], default="astar")
-    parser.add_argument("--heuristica", choices=["fuera", "manhattan", "conflicto"], default="manhattan")
+    parser.add_argument("--columnas", type=int, default=None,
+                        help="Columnas para un tablero rectangular de N filas (por defecto N).")
+    parser.add_argument("--tecnica", choices=["astar", "codicioso", "idastar", "bidireccional", "mm", "smastar",
+                                              "ponderado", "ara", "anchura", "profundidad", "iddfs", "hda"],
+                        default="astar")
+    parser.add_argument("--heuristica", choices=list(HEURISTICAS), default="manhattan")
     parser.add_argument("--mezcla", type=int, default=30, help="Número de pasos aleatorios desde la meta.")
     parser.add_argument("--semilla", type=int, default=7, help="Semilla para la mezcla.")
     parser.add_argument(
@@ -40,24 +46,68 @@ def main():
         default="",
         help="Estado inicial explícito (ej: '1 2 3 4 5 6 7 8 0'). Si se omite, se usa mezcla aleatoria.",
     )
+    parser.add_argument("--meta", type=str, default="",
+                        help="Estado meta explícito (por defecto 1..n-1 con el blanco al final).")
+    parser.add_argument("--lista", choices=["heap", "heap_g", "cubetas"], default="heap",
+                        help="Lista abierta de la búsqueda mejor-primero (heap_g y cubetas: ante "
+                             "igual f, primero el nodo más profundo; cambia las rutas de igual f).")
+    parser.add_argument("--max_nodos", type=int, default=None,
+                        help="Presupuesto de nodos en memoria para smastar.")
+    parser.add_argument("--peso", type=float, default=2.0,
+                        help="Peso w de ponderado (f = g + w*h) y peso inicial de ara.")
+    parser.add_argument("--paso_peso", type=float, default=0.5,
+                        help="Cuánto baja el peso entre pasadas de ara.")
+    parser.add_argument("--limite_tiempo", type=float, default=None,
+                        help="Segundos para ara; se queda con la mejor ruta hallada.")
+    parser.add_argument("--limite_profundidad", type=int, default=None,
+                        help="Profundidad máxima de profundidad e iddfs.")
+    parser.add_argument("--trabajadores", type=int, default=None,
+                        help="Procesos de hda (por defecto uno por CPU).")
+    parser.add_argument("--sin_serial", action="store_true",
+                        help="Con hda, no correr A* serial para comparar.")
+    parser.add_argument("--max_cache", type=int, default=None,
+                        help="Tope LRU de la caché de sucesores (por defecto sin tope).")
+    parser.add_argument("--compacto", action="store_true",
+                        help="Busca sobre tableros empaquetados en un int (menos memoria).")
+    parser.add_argument("--cache", type=str, default=None, metavar="RUTA",
+                        help="Caché persistente de soluciones (distancias exactas entre corridas).")
+    parser.add_argument("--cache_capacidad", type=int, default=1 << 20,
+                        help="Entradas de la caché de soluciones al crearla.")
     parser.add_argument("--mostrar_ruta", action="store_true", help="Imprime todos los tableros de la ruta.")
     args = parser.parse_args()
+    if args.tecnica == "ponderado" and args.lista == "cubetas" and args.peso != int(args.peso):
+        parser.error("--lista cubetas necesita f entero: usar un --peso entero con ponderado")
 
-    # Meta (orden natural con 0 como blanco al final)
-    meta = Tablero(args.N, tuple([*range(1, args.N*args.N), 0]))
+    # Meta (por defecto orden natural con 0 como blanco al final)
+    C = args.columnas or args.N
+    if args.meta:
+        meta = parsear_estado(args.meta, args.N, C)
+    else:
+        meta = Tablero(args.N, meta_estandar(args.N, C))
 
-    # Estado inicial
+    # Estado inicial (la mezcla parte de la meta)
     if args.estado:
-        inicial = parsear_estado(args.estado, args.N)
+        inicial = parsear_estado(args.estado, args.N, C)
+        if not es_resoluble(inicial, meta):
+            raise SystemExit("La meta no es alcanzable desde el estado inicial.")
     else:
-        inicial = mezclar_aleatorio(args.N, pasos=args.mezcla, semilla=args.semilla)
+        inicial = mezclar_aleatorio(args.N, pasos=args.mezcla, semilla=args.semilla, meta=meta)
 
     # Heurística
     hfun = HEURISTICAS[args.heuristica]
 
     # Agente
-    agente = AgenteNPuzzle(N=args.N, heuristica=hfun, tecnica=args.tecnica)
-    agente.fijar_estados(inicial, meta)
+    def crear_agente(tecnica, con_cache=True):
+        ag = AgenteNPuzzle(N=args.N, heuristica=hfun, tecnica=tecnica, compacto=args.compacto,
+                           lista_abierta=args.lista, max_nodos=args.max_nodos,
+                           max_cache=args.max_cache, peso=args.peso, paso_peso=args.paso_peso,
+                           limite_tiempo=args.limite_tiempo, limite_profundidad=args.limite_profundidad,
+                           trabajadores=args.trabajadores,
+                           cache_soluciones=(CacheSoluciones(args.cache, args.N, args.cache_capacidad)
+                                             if args.cache and con_cache else None))
+        ag.fijar_estados(inicial, meta)
+        return ag
+    agente = crear_agente(args.tecnica)
 
     print("\n== N-Puzzle ==")
     print(f"Técnica: {args.tecnica} | Heurística: {args.heuristica}")
@@ -67,7 +117,13 @@ def main():
     imprimir_tablero(meta)
 
     t0 = perf_counter()
-    agente.programa()
+    if args.tecnica == "ara":
+        # cada ruta mejorada se muestra apenas aparece
+        for s in agente.soluciones(args.limite_tiempo):
+            print(f"  [{s['tiempo_s']*1000:8.1f} ms] costo {s['costo']} (peso {s['peso']:.2f}, "
+                  f"cota {s['cota']:.3f}, {s['expandidos']} expandidos)", flush=True)
+    else:
+        agente.programa()
     dt = perf_counter() - t0
 
     ruta = agente.get_acciones()
@@ -88,6 +144,56 @@ def main():
     print(f"Nodos explorados:    {nodos}")
     print(f"Costo (g):           {costo}")
     print(f"Tiempo:              {dt*1000:.1f} ms")
+    if "generados" in metr:
+        print(f"Generados:           {metr['generados']} ({metr['duplicados']} duplicados, "
+              f"{metr['reabiertos']} reabiertos)")
+        print(f"Tiempo h/succ/cola:  {metr['t_heuristica']*1000:.1f} / {metr['t_sucesores']*1000:.1f} / "
+              f"{metr['t_cola']*1000:.1f} ms")
+    if "aciertos_cache_soluciones" in metr:
+        print(f"Caché soluciones:    {metr['aciertos_cache_soluciones']} aciertos"
+              + (" (ruta completada desde la caché)" if metr.get("atajo") else ""))
+    if "capas" in metr:
+        print(f"Capas BFS:           {len(metr['capas'])} (tamaños {metr['capas']})")
+    if "cortados" in metr:
+        print(f"Límite profundidad:  {metr['limite_profundidad']} ({metr['cortados']} nodos cortados)")
+    if "cota" in metr:
+        print(f"Suboptimalidad:      costo <= {metr['cota']:.3f} x óptimo"
+              + (" (límite de tiempo alcanzado)" if metr.get("limite_alcanzado") else ""))
+    if "lista_abierta" in metr:
+        print(f"Lista abierta:       {metr['lista_abierta']} (pico {metr['pico_abiertos']})")
+    if "evicciones" in metr:
+        print(f"Memoria acotada:     límite {metr['limite_nodos']} nodos, pico {metr['pico_nodos']}, "
+              f"{metr['evicciones']} olvidados, {metr['regenerados']} regenerados")
+    if "trabajadores" in metr:
+        k = metr["trabajadores"]
+        por = metr["expandidos_por_trabajador"]
+        print(f"HDA*:                {k} trabajadores, {metr['lotes_enviados']} lotes, "
+              f"{metr['rondas_sondeo']} sondeos; expandidos por trabajador {por} "
+              f"(desbalance {max(por) / (sum(por) / k):.2f})")
+        if not args.sin_serial:
+            # referencia: A* serial con la misma heuristica (sin la cache de
+            # soluciones, que ya tendria la ruta recien hallada)
+            def correr(tecnica, trabajadores=None):
+                ag = crear_agente(tecnica, con_cache=False)
+                ag.trabajadores = trabajadores
+                t0 = perf_counter()
+                ag.programa()
+                return perf_counter() - t0, ag.get_medida_rendimiento()
+
+            dt_serial, ms = correr("astar")
+            aceleracion = dt_serial / dt
+            print(f"A* serial:           {ms['expandidos']} expandidos, costo {ms.get('costo')}, "
+                  f"{dt_serial*1000:.1f} ms")
+            print(f"Escalado:            aceleración {aceleracion:.2f}x, eficiencia {aceleracion / k:.0%}, "
+                  f"sobrecarga de búsqueda {metr['expandidos'] / max(1, ms['expandidos']) - 1:+.1%}")
+            if k > 1:
+                # HDA* con un proceso: separa el costo de los mensajes del de la busqueda
+                dt_uno, m1 = correr("hda", 1)
+                print(f"HDA* 1 trabajador:   {m1['expandidos']} expandidos, {dt_uno*1000:.1f} ms "
+                      f"(aceleración de {k} sobre 1: {dt_uno / dt:.2f}x)")
+    for it in metr.get("iteraciones", []):
+        cota = "limite" if "limite" in it else "umbral"
+        print(f"  {cota}={it[cota]:<4} nodos={it['nodos']}")
 
     if args.mostrar_ruta:
         print("\n--- Ruta ---")
@@ -0,0 +1,52 @@
+"""Tablas precalculadas por (forma, meta) para las heuristicas.
+
+Un tablero de R filas y C columnas guarda sus fichas por filas; la meta es
+cualquier permutacion de 0..R*C-1 (0 = blanco). Para cada meta se calcula
+una sola vez, y queda en un cache LRU por (R, C, meta):
+  - casilla, fila y columna meta de cada ficha;
+  - distancia[f][i]: distancia Manhattan de la ficha f puesta en la casilla i
+    a su casilla meta (0 para el blanco).
+La fila/columna meta de cada ficha sirve tambien para decidir si una ficha
+esta en su linea meta al contar conflictos lineales.
+"""
+from functools import lru_cache
+from typing import Optional, Tuple
+
+
+def meta_estandar(R: int, C: Optional[int] = None) -> Tuple[int, ...]:
+    """1..R*C-1 por filas con el blanco al final."""
+    n = R * (C or R)
+    return (*range(1, n), 0)
+
+
+class TablaMeta:
+    """Posiciones meta y distancias por ficha para una forma y una meta."""
+
+    __slots__ = ("R", "C", "meta", "casilla", "fila", "columna", "distancia")
+
+    def __init__(self, R: int, C: int, meta: Tuple[int, ...]):
+        n = R * C
+        if len(meta) != n or sorted(meta) != list(range(n)):
+            raise ValueError(f"La meta debe ser una permutación de 0..{n-1} ({R}x{C})")
+        self.R, self.C, self.meta = R, C, tuple(meta)
+        casilla = [0] * n
+        for i, f in enumerate(meta):
+            casilla[f] = i
+        self.casilla = tuple(casilla)
+        self.fila = tuple(i // C for i in casilla)
+        self.columna = tuple(i % C for i in casilla)
+        self.distancia = tuple(
+            tuple(0 if f == 0 else abs(i // C - self.fila[f]) + abs(i % C - self.columna[f])
+                  for i in range(n))
+            for f in range(n))
+
+    @property
+    def es_estandar(self) -> bool:
+        return self.meta == meta_estandar(self.R, self.C)
+
+
+@lru_cache(maxsize=256)
+def tabla_meta(R: int, C: Optional[int] = None, meta: Optional[Tuple[int, ...]] = None) -> TablaMeta:
+    """TablaMeta de la forma R x C (C = R si se omite) y la meta (estandar si se omite)."""
+    C = C or R
+    return TablaMeta(R, C, meta_estandar(R, C) if meta is None else tuple(meta))
@@ -0,0 +1,171 @@
+"""Almacen columnar de resultados de experimentos (NumPy + mmap).
+
+Formato del archivo:
+  firma "RES1" | largo de la cabecera (uint32) | cabecera JSON | columnas
+La cabecera lista cada columna (nombre, dtype, desplazamiento), las
+categorias de las columnas de texto (tecnica, heuristica, ...), que se
+guardan como codigos enteros, y el indice por (tecnica, heuristica): un
+orden de filas ordenado por instancia y el rango [inicio, fin) de cada grupo.
+Cada columna empieza alineada a 64 bytes y se carga con np.frombuffer sobre
+el archivo mapeado, sin copiar.
+
+    python -m NPuzzle.resultados resultados_npuzzle.csv resultados_npuzzle.res
+"""
+import argparse, csv, json, mmap, os, struct
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+_CABECERA = struct.Struct("<4sI")  # firma, bytes de la cabecera JSON
+_FIRMA = b"RES1"
+_ALINEACION = 64
+# Columnas que identifican una instancia dentro de un grupo (tecnica, heuristica)
+CLAVE_INSTANCIA = ("N", "mezcla", "instancia")
+
+
+def _columna(valores: List[str]) -> Tuple[np.ndarray, List[str]]:
+    """Convierte una columna de texto al tipo mas chico que la representa."""
+    try:
+        enteros = np.array([int(v) for v in valores], dtype=np.int64)
+    except ValueError:
+        pass
+    else:
+        if len(enteros) == 0:
+            return enteros, None
+        for tipo in (np.int8, np.int16, np.int32):
+            info = np.iinfo(tipo)
+            if info.min <= enteros.min() and enteros.max() <= info.max:
+                return enteros.astype(tipo), None
+        return enteros, None
+    try:
+        return np.array([float(v) for v in valores], dtype=np.float64), None
+    except ValueError:
+        categorias, codigos = np.unique(np.array(valores, dtype=object), return_inverse=True)
+        tipo = np.uint8 if len(categorias) <= 256 else np.uint32
+        return codigos.astype(tipo), [str(c) for c in categorias]
+
+
+class TablaResultados:
+    """Resultados por columnas con un indice por (tecnica, heuristica)."""
+
+    def __init__(self, columnas: Dict[str, np.ndarray], categorias: Dict[str, List[str]]):
+        self.columnas = columnas
+        self.categorias = categorias
+        self._mapa = None  # mmap que respalda las columnas cargadas
+        n = {len(c) for c in columnas.values()}
+        if len(n) > 1:
+            raise ValueError("Las columnas tienen largos distintos")
+        self.filas = n.pop() if n else 0
+        self._indexar()
+
+    def _indexar(self) -> None:
+        # orden de filas por (tecnica, heuristica, N, mezcla, instancia)
+        claves = [self.columnas[c] for c in reversed(CLAVE_INSTANCIA)]
+        tec, heu = self.columnas["tecnica"], self.columnas["heuristica"]
+        orden = np.lexsort(claves + [heu, tec])
+        t, h = tec[orden], heu[orden]
+        cortes = np.flatnonzero((t[1:] != t[:-1]) | (h[1:] != h[:-1])) + 1
+        inicios = np.concatenate(([0], cortes)).astype(np.int64)
+        fines = np.concatenate((cortes, [self.filas])).astype(np.int64)
+        self.columnas["_orden"] = orden.astype(np.int64)
+        self._grupos = {
+            (self.categorias["tecnica"][t[i]], self.categorias["heuristica"][h[i]]): (int(i), int(f))
+            for i, f in zip(inicios, fines) if f > i}
+
+    @classmethod
+    def desde_csv(cls, ruta: str) -> "TablaResultados":
+        with open(ruta, newline="") as f:
+            lector = csv.reader(f)
+            nombres = next(lector)
+            valores = [[] for _ in nombres]
+            for fila in lector:
+                for v, x in zip(valores, fila):
+                    v.append(x)
+        columnas, categorias = {}, {}
+        for nombre, v in zip(nombres, valores):
+            columnas[nombre], cats = _columna(v)
+            if cats is not None:
+                categorias[nombre] = cats
+        for c in ("tecnica", "heuristica", *CLAVE_INSTANCIA):
+            if c not in columnas:
+                raise ValueError(f"{ruta}: falta la columna {c}")
+        return cls(columnas, categorias)
+
+    def guardar(self, ruta: str) -> None:
+        descripcion, pos = [], 0
+        for nombre, col in self.columnas.items():
+            pos = -(-pos // _ALINEACION) * _ALINEACION
+            descripcion.append({"nombre": nombre, "dtype": col.dtype.str, "desplazamiento": pos})
+            pos += col.nbytes
+        cabecera = {"filas": self.filas, "columnas": descripcion,
+                    "categorias": self.categorias,
+                    "grupos": [[t, h, i, f] for (t, h), (i, f) in self._grupos.items()]}
+        texto = json.dumps(cabecera).encode()
+        inicio = -(-(_CABECERA.size + len(texto)) // _ALINEACION) * _ALINEACION
+        tmp = ruta + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(_CABECERA.pack(_FIRMA, len(texto)))
+            f.write(texto)
+            for d, col in zip(descripcion, self.columnas.values()):
+                f.seek(inicio + d["desplazamiento"])
+                f.write(np.ascontiguousarray(col).tobytes())
+        os.replace(tmp, ruta)
+
+    @classmethod
+    def cargar(cls, ruta: str) -> "TablaResultados":
+        """Mapea el archivo en memoria (solo lectura); las columnas no se copian."""
+        with open(ruta, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        firma, largo = _CABECERA.unpack_from(mm, 0)
+        if firma != _FIRMA:
+            raise ValueError(f"Archivo de resultados inválido: {ruta}")
+        cabecera = json.loads(bytes(mm[_CABECERA.size:_CABECERA.size + largo]))
+        inicio = -(-(_CABECERA.size + largo) // _ALINEACION) * _ALINEACION
+        n = cabecera["filas"]
+        columnas = {d["nombre"]: np.frombuffer(mm, dtype=np.dtype(d["dtype"]), count=n,
+                                               offset=inicio + d["desplazamiento"])
+                    for d in cabecera["columnas"]}
+        tabla = cls.__new__(cls)
+        tabla.columnas = columnas
+        tabla.categorias = cabecera["categorias"]
+        tabla.filas = n
+        tabla._grupos = {(t, h): (i, f) for t, h, i, f in cabecera["grupos"]}
+        tabla._mapa = mm
+        return tabla
+
+    def __len__(self):
+        return self.filas
+
+    def grupos(self) -> List[Tuple[str, str]]:
+        return list(self._grupos)
+
+    def filas_de(self, tecnica: str, heuristica: str) -> np.ndarray:
+        """Indices de las filas del grupo, ordenados por (N, mezcla, instancia)."""
+        i, f = self._grupos.get((tecnica, heuristica), (0, 0))
+        return self.columnas["_orden"][i:f]
+
+    def clave_instancia(self, filas: np.ndarray) -> np.ndarray:
+        """(N, mezcla, instancia) combinados en un entero, creciente con el orden del indice."""
+        N, mezcla, instancia = (self.columnas[c][filas].astype(np.int64) for c in CLAVE_INSTANCIA)
+        return (N << 48) | (mezcla << 28) | instancia
+
+    def emparejar(self, tecnica: str, h1: str, h2: str, metrica: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Metrica de h1 y h2 sobre las instancias resueltas por ambas (join por arreglos)."""
+        f1, f2 = self.filas_de(tecnica, h1), self.filas_de(tecnica, h2)
+        _, i1, i2 = np.intersect1d(self.clave_instancia(f1), self.clave_instancia(f2),
+                                   return_indices=True)
+        col = self.columnas[metrica]
+        return col[f1[i1]].astype(np.float64), col[f2[i2]].astype(np.float64)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Convierte un CSV de resultados al formato columnar.")
+    ap.add_argument("csv")
+    ap.add_argument("salida")
+    args = ap.parse_args()
+    tabla = TablaResultados.desde_csv(args.csv)
+    tabla.guardar(args.salida)
+    print(f"{len(tabla)} filas, {len(tabla.grupos())} grupos -> {args.salida}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""Tabla completa de distancias a la meta del 8-puzzle (y del 3-puzzle).
+
+Un unico BFS desde la meta recorre los 9!/2 = 181440 estados alcanzables; la
+distancia de cada uno se guarda en un arreglo de bytes indexado por el rango
+de Lehmer de sus fichas (los 9! rangos, 255 = no alcanzable) y se mapea en
+memoria desde pdbs/ la primera vez que se consulta. Distancia y siguiente
+movimiento optimo salen en O(1).
+
+    python -m NPuzzle.tabla_perfecta --N 3
+    python -m NPuzzle.tabla_perfecta --N 3 --externa --memoria 50000
+"""
+import argparse, mmap, os, struct
+from collections import Counter
+from math import factorial
+from time import perf_counter
+from typing import List, Optional
+
+from .tablero import Tablero, vecinos_blanco
+from .bd_patrones import rango, DIRECTORIO
+from .bfs_externa import BFSExterna, sucesores_npuzzle
+
+_CABECERA = struct.Struct("<4sB")  # firma, N
+_FIRMA = b"PER1"
+_SIN_VALOR = 255
+N_MAXIMO = 3  # 4x4 tendria 16! entradas
+
+
+def ruta_archivo(N: int, directorio: str = DIRECTORIO) -> str:
+    return os.path.join(directorio, f"perfecta_{N}.bin")
+
+def construir(N: int) -> bytearray:
+    """BFS desde la meta; tabla[rango(fichas)] = distancia."""
+    n = N*N
+    vecinos = vecinos_blanco(N)
+    tabla = bytearray([_SIN_VALOR]) * factorial(n)
+    meta = [*range(1, n), 0]
+    tabla[rango(meta, n)] = 0
+    capa, d = [meta], 0
+    while capa:
+        d += 1
+        siguiente = []
+        for fichas in capa:
+            b = fichas.index(0)
+            for j in vecinos[b]:
+                hijo = fichas[:]
+                hijo[b], hijo[j] = hijo[j], 0
+                r = rango(hijo, n)
+                if tabla[r] == _SIN_VALOR:
+                    tabla[r] = d
+                    siguiente.append(hijo)
+        capa = siguiente
+    return tabla
+
+def construir_externo(N: int, memoria: int = 1 << 20, directorio: Optional[str] = None) -> bytearray:
+    """Igual que `construir`, pero con el BFS en disco: en RAM solo queda la tabla."""
+    n = N*N
+    tabla = bytearray([_SIN_VALOR]) * factorial(n)
+    sucesores, codificar, decodificar = sucesores_npuzzle(N)
+    bfs = BFSExterna(sucesores, directorio, memoria)
+    for d, capa in bfs.recorrer([codificar(Tablero(N, (*range(1, n), 0)))]):
+        for x in bfs.leer(capa):
+            tabla[rango(decodificar(x).fichas, n)] = d
+    return tabla
+
+def guardar(ruta: str, N: int, tabla: bytearray) -> None:
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    tmp = ruta + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(_CABECERA.pack(_FIRMA, N))
+        f.write(tabla)
+    os.replace(tmp, ruta)
+
+def cargar(ruta: str, N: int) -> memoryview:
+    with open(ruta, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    firma, n = _CABECERA.unpack_from(mm, 0)
+    if firma != _FIRMA or n != N or len(mm) != _CABECERA.size + factorial(N*N):
+        raise ValueError(f"Tabla perfecta inválida: {ruta}")
+    return memoryview(mm)[_CABECERA.size:]
+
+
+class TablaPerfecta:
+    """Distancia exacta a la meta 1..N²-1, 0; usable como heuristica h = h*."""
+
+    def __init__(self, N: int = 3, directorio: str = DIRECTORIO):
+        if N > N_MAXIMO:
+            raise ValueError(f"TablaPerfecta admite N <= {N_MAXIMO} (N={N})")
+        self.N = N
+        self.directorio = directorio
+        self._tabla: Optional[memoryview] = None
+
+    def cargar(self, construir_si_falta: bool = True) -> "TablaPerfecta":
+        if self._tabla is None:
+            ruta = ruta_archivo(self.N, self.directorio)
+            if not os.path.exists(ruta):
+                if not construir_si_falta:
+                    raise FileNotFoundError(ruta)
+                print(f"Construyendo tabla perfecta (N={self.N})...", flush=True)
+                guardar(ruta, self.N, construir(self.N))
+            self._tabla = cargar(ruta, self.N)
+        return self
+
+    def distancia(self, t: Tablero) -> Optional[int]:
+        """Movimientos optimos hasta la meta; None si t no es resoluble."""
+        if t.N != self.N or len(t.fichas) != self.N * self.N:
+            raise ValueError(f"Tabla para {self.N}x{self.N}, tablero de {t.N}x{t.columnas}")
+        if self._tabla is None:
+            self.cargar()
+        d = self._tabla[rango(t.fichas, self.N * self.N)]
+        return None if d == _SIN_VALOR else d
+
+    def __call__(self, t: Tablero, meta: Optional[Tablero] = None) -> int:
+        if meta is not None and not meta.es_meta():
+            raise ValueError("La tabla perfecta solo vale para la meta estándar")
+        d = self.distancia(t)
+        if d is None:
+            raise ValueError(f"Tablero no resoluble: {t.fichas}")
+        return d
+
+    def siguiente(self, t: Tablero) -> Optional[Tablero]:
+        """Vecino de t a un paso menos de la meta (None en la meta)."""
+        d = self(t)
+        if d == 0:
+            return None
+        for hijo in t.sucesores():
+            if self.distancia(hijo) == d - 1:
+                return hijo
+        raise ValueError("Tabla perfecta inconsistente")
+
+    def ruta(self, t: Tablero) -> List[Tablero]:
+        """Ruta optima completa de t a la meta."""
+        ruta = [t]
+        while (t := self.siguiente(t)) is not None:
+            ruta.append(t)
+        return ruta
+
+    def verificar(self, ruta: List[Tablero], optima: bool = True) -> None:
+        """ValueError si la ruta no es legal, no llega a la meta o (optima) no es minima."""
+        if not ruta:
+            raise ValueError("Ruta vacia")
+        for a, b in zip(ruta, ruta[1:]):
+            if b not in set(a.sucesores()):
+                raise ValueError(f"Movimiento ilegal {a.fichas} -> {b.fichas}")
+        if self(ruta[-1]) != 0:
+            raise ValueError("La ruta no termina en la meta")
+        d = self(ruta[0])
+        if optima and len(ruta) - 1 != d:
+            raise ValueError(f"Ruta de {len(ruta) - 1} pasos; el optimo es {d}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Construye la tabla perfecta de distancias.")
+    ap.add_argument("--N", type=int, choices=range(2, N_MAXIMO + 1), default=3)
+    ap.add_argument("--directorio", default=DIRECTORIO)
+    ap.add_argument("--externa", action="store_true",
+                    help="BFS en disco (bfs_externa) en lugar de en memoria.")
+    ap.add_argument("--memoria", type=int, default=1 << 20,
+                    help="Con --externa: hijos en RAM antes de volcar una corrida.")
+    args = ap.parse_args()
+    t0 = perf_counter()
+    tabla = construir_externo(args.N, args.memoria) if args.externa else construir(args.N)
+    ruta = ruta_archivo(args.N, args.directorio)
+    guardar(ruta, args.N, tabla)
+    capas = Counter(tabla)
+    alcanzables = len(tabla) - capas.pop(_SIN_VALOR, 0)
+    print(f"{alcanzables} estados, distancia maxima {max(capas)} "
+          f"({perf_counter()-t0:.1f} s) -> {ruta}")
+    print("estados por distancia:", [capas[d] for d in range(max(capas) + 1)])
+
+if __name__ == "__main__":
+    main()
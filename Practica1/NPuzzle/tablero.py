@@ -1,66 +1,156 @@
 from dataclasses import dataclass
-from typing import Tuple, Iterable, List
+from functools import lru_cache
+from typing import Tuple, Iterable, List, Optional
 import random
 
+from .metas import meta_estandar, tabla_meta
 
 
 @dataclass(frozen=True, order=True)
 
 class Tablero:
-    N: int
-    fichas: Tuple[int, ...]  # 0 = blanco
+    N: int                   # filas (y columnas si el tablero es cuadrado)
+    fichas: Tuple[int, ...]  # 0 = blanco; por filas, N*columnas casillas
+
+    @property
+    def columnas(self) -> int:
+        return len(self.fichas) // self.N
 
     def posicion(self, ficha: int) -> tuple[int, int]:
         i = self.fichas.index(ficha)
-        return divmod(i, self.N)
+        return divmod(i, self.columnas)
 
-    def es_meta(self) -> bool:
-        return self.fichas == tuple([*range(1, self.N*self.N), 0])
+    def es_meta(self, meta: Optional["Tablero"] = None) -> bool:
+        """Si es `meta` (por defecto la estandar 1..n-1, 0 de su forma)."""
+        if meta is not None:
+            return self.fichas == meta.fichas
+        return self.fichas == meta_estandar(self.N, self.columnas)
 
     def sucesores(self) -> Iterable["Tablero"]:
+        for hijo, _, _, _ in self.movimientos():
+            yield hijo
+
+    def movimientos(self) -> Iterable[Tuple["Tablero", int, int, int]]:
+        """Genera (hijo, ficha, desde, hasta): la ficha se desliza al hueco."""
         N = self.N
-        r0, c0 = self.posicion(0)
-        for dr, dc in ((-1,0),(1,0),(0,-1),(0,1)):
-            nr, nc = r0+dr, c0+dc
-            if 0 <= nr < N and 0 <= nc < N:
-                j0, j1 = r0*N+c0, nr*N+nc
-                t = list(self.fichas)
-                t[j0], t[j1] = t[j1], t[j0]
-                yield Tablero(N, tuple(t))
-
-    def manhattan_de_ficha(self, ficha: int) -> int:
-        if ficha == 0: return 0
-        N = self.N
-        r, c = self.posicion(ficha)
-        gr, gc = divmod(ficha-1, N)
-        return abs(r-gr) + abs(c-gc)
+        j0 = self.fichas.index(0)
+        for j1 in vecinos_blanco(N, self.columnas)[j0]:
+            t = list(self.fichas)
+            t[j0], t[j1] = t[j1], t[j0]
+            yield Tablero(N, tuple(t)), t[j0], j1, j0
+
+    def manhattan_de_ficha(self, ficha: int, meta: Optional["Tablero"] = None) -> int:
+        m = tabla_meta(self.N, self.columnas, None if meta is None else meta.fichas)
+        return m.distancia[ficha][self.fichas.index(ficha)]
+
+@lru_cache(maxsize=None)
+def vecinos_blanco(N: int, C: Optional[int] = None) -> Tuple[Tuple[int, ...], ...]:
+    """Para cada posicion del blanco, las posiciones a las que puede moverse
+    (arriba, abajo, izquierda, derecha) en un tablero de N filas y C columnas."""
+    C = C or N
+    tabla = []
+    for i in range(N*C):
+        r0, c0 = divmod(i, C)
+        tabla.append(tuple(nr*C+nc for nr, nc in ((r0-1,c0),(r0+1,c0),(r0,c0-1),(r0,c0+1))
+                           if 0 <= nr < N and 0 <= nc < C))
+    return tuple(tabla)
 
 def contar_inversiones(a: List[int]) -> int:
+    """Inversiones (sin el blanco) con un arbol de Fenwick: O(n log n)."""
     a = [x for x in a if x != 0]
+    rango = {x: i+1 for i, x in enumerate(sorted(a))}
+    n = len(a)
+    arbol = [0] * (n+1)
     inv = 0
-    for i in range(len(a)):
-        for j in range(i+1, len(a)):
-            inv += a[i] > a[j]
+    for vistos, x in enumerate(a):
+        j = r = rango[x]
+        menores = 0
+        while j > 0:
+            menores += arbol[j]
+            j -= j & -j
+        inv += vistos - menores  # anteriores mayores que x
+        j = r
+        while j <= n:
+            arbol[j] += 1
+            j += j & -j
     return inv
 
-def es_resoluble(t: Tablero) -> bool:
-    N = t.N
-    inv = contar_inversiones(list(t.fichas))
-    if N % 2 == 1:
-        return inv % 2 == 0
-    r0, _ = t.posicion(0)
-    fila_desde_abajo = N - r0
-    return (inv + fila_desde_abajo) % 2 == 1
-
-def mezclar_aleatorio(N: int, pasos: int = 40, semilla: int | None = None) -> Tablero:
-    if semilla is not None: random.seed(semilla)
-    t = Tablero(N, tuple([*range(1, N*N), 0]))
-    anterior = None
+def _paridad(fichas: Tuple[int, ...], C: int) -> int:
+    # Invariante de los movimientos: un movimiento horizontal no cambia las
+    # inversiones; uno vertical las cambia en C-1 y mueve el blanco una fila
+    inv = contar_inversiones(list(fichas))
+    if C % 2 == 1:
+        return inv % 2
+    return (inv + fichas.index(0) // C) % 2
+
+def es_resoluble(t: Tablero, meta: Optional[Tablero] = None) -> bool:
+    """Si desde t se llega a `meta` (por defecto, la meta estandar de su forma)."""
+    C = t.columnas
+    objetivo = meta_estandar(t.N, C) if meta is None else meta.fichas
+    if len(objetivo) != len(t.fichas) or sorted(objetivo) != sorted(t.fichas):
+        return False
+    return _paridad(t.fichas, C) == _paridad(objetivo, C)
+
+def mezclar_aleatorio(N: int, pasos: int = 40, semilla: int | None = None,
+                      C: Optional[int] = None, meta: Optional[Tablero] = None) -> Tablero:
+    """Caminata aleatoria de `pasos` movimientos desde la meta (estandar de N x C si se omite)."""
+    # RNG propio (no toca el estado global de `random`); con la misma semilla
+    # produce la misma caminata que la version basada en Tablero.sucesores()
+    rng = random.Random(semilla)
+    if meta is not None:
+        N, C = meta.N, meta.columnas
+    fichas = list(meta.fichas) if meta is not None else list(meta_estandar(N, C))
+    b, anterior = fichas.index(0), None
+    vecinos = vecinos_blanco(N, C)
+    for _ in range(pasos):
+        j = rng.choice([j for j in vecinos[b] if j != anterior])
+        fichas[b], fichas[j] = fichas[j], 0
+        anterior, b = b, j
+    return Tablero(N, tuple(fichas))
+
+def generar_instancias(N: int, k: int, pasos: int = 40, semilla: int | None = None,
+                       metodo: str = "caminata") -> List[Tablero]:
+    """Genera k instancias resolubles de una vez, con un RNG privado sembrado.
+
+    - 'caminata': k caminatas aleatorias de `pasos` pasos (sin deshacer el
+      paso anterior) avanzando todas a la vez con NumPy.
+    - 'uniforme': permutaciones uniformes; si una no es resoluble se corrige
+      la paridad intercambiando dos fichas (no el blanco).
+    """
+    if metodo == "uniforme":
+        rng = random.Random(semilla)
+        res = []
+        for _ in range(k):
+            fichas = list(range(N*N))
+            rng.shuffle(fichas)
+            t = Tablero(N, tuple(fichas))
+            if not es_resoluble(t):
+                i, j = [x for x in range(N*N) if fichas[x] != 0][:2]
+                fichas[i], fichas[j] = fichas[j], fichas[i]
+                t = Tablero(N, tuple(fichas))
+            res.append(t)
+        return res
+    if metodo != "caminata":
+        raise ValueError(f"Método de generación no soportado: {metodo}")
+
+    import numpy as np
+    rng = np.random.default_rng(semilla)
+    n = N*N
+    # vecinos del blanco rellenados con -1 hasta 4 columnas
+    tabla = np.full((n, 4), -1)
+    for i, vs in enumerate(vecinos_blanco(N)):
+        tabla[i, :len(vs)] = vs
+    fichas = np.tile(np.array([*range(1, n), 0]), (k, 1))
+    filas = np.arange(k)
+    blanco = np.full(k, n-1)
+    anterior = np.full(k, -1)
     for _ in range(pasos):
-        cands = list(t.sucesores())
-        if anterior is not None:
-            cands = [x for x in cands if x.fichas != anterior]
-        nxt = random.choice(cands)
-        anterior = t.fichas
-        t = nxt
-    return t
+        cands = tabla[blanco]                                  # (k, 4)
+        validos = (cands >= 0) & (cands != anterior[:, None])
+        # eleccion uniforme entre los validos: maximo de ruido enmascarado
+        elegido = np.argmax(np.where(validos, rng.random((k, 4)), -1.0), axis=1)
+        destino = cands[filas, elegido]
+        fichas[filas, blanco] = fichas[filas, destino]
+        fichas[filas, destino] = 0
+        anterior, blanco = blanco, destino
+    return [Tablero(N, tuple(int(x) for x in fila)) for fila in fichas]
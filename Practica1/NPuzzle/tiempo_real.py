@@ -0,0 +1,118 @@
+"""Busqueda en tiempo real (LRTA*/RTA*) sobre el ciclo percepcion-accion.
+
+El entorno guarda el tablero; en cada turno le pasa el tablero al agente
+como percepcion, el agente planifica a lo sumo `presupuesto_ms` y se
+compromete con un movimiento, que el entorno aplica. La tabla h aprendida
+queda en el agente, asi que repetir ensayos desde el mismo inicial converge
+(con 'lrta') hacia la ruta optima.
+
+    python -m NPuzzle.tiempo_real --N 4 --mezcla 60 --presupuesto_ms 5 --ensayos 10
+"""
+import argparse
+from statistics import mean
+from typing import Dict, List, Optional
+
+from AgenteIA.Entorno import Entorno
+from .tablero import Tablero, mezclar_aleatorio
+from .heuristicas import HEURISTICAS
+from .agente_npuzzle import AgenteNPuzzle
+from .metas import meta_estandar
+
+
+class EntornoNPuzzle(Entorno):
+    """Tablero que los agentes mueven de a un paso por turno."""
+
+    def __init__(self, inicial: Tablero, meta: Tablero, max_movimientos: Optional[int] = None):
+        super().__init__()
+        self.inicial = inicial
+        self.meta = meta
+        self.max_movimientos = max_movimientos
+        self.reiniciar()
+
+    def reiniciar(self) -> None:
+        """Vuelve al tablero inicial para un nuevo ensayo (los agentes conservan lo aprendido)."""
+        self.tablero = self.inicial
+        self.ruta = [self.inicial]
+        for agente in self.agentes:
+            agente.habilitado = True
+
+    def insertar(self, a):
+        super().insertar(a)
+        a.habilitado = not self.llego()
+
+    def llego(self) -> bool:
+        return self.tablero.es_meta(self.meta)
+
+    def get_percepciones(self, agente):
+        agente.percepcion = self.tablero
+
+    def ejecutar(self, agente):
+        if not agente.esta_habilitado():
+            return
+        agente.programa()
+        siguiente = agente.get_acciones()[-1]
+        if siguiente not in set(self.tablero.sucesores()):
+            raise ValueError(f"Movimiento ilegal {self.tablero.fichas} -> {siguiente.fichas}")
+        self.tablero = siguiente
+        self.ruta.append(siguiente)
+        if self.llego() or (self.max_movimientos is not None
+                            and len(self.ruta) - 1 >= self.max_movimientos):
+            agente.habilitado = False
+
+
+def resumen_latencias(latencias: List[float]) -> Dict[str, float]:
+    """Media, percentiles 50/95/99 y maximo de las latencias (ms)."""
+    if not latencias:
+        return {"media": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    xs = sorted(latencias)
+    def pct(p):
+        return xs[min(len(xs) - 1, int(p * len(xs)))]
+    return {"media": mean(xs), "p50": pct(0.50), "p95": pct(0.95), "p99": pct(0.99), "max": xs[-1]}
+
+
+def ensayos(agente: AgenteNPuzzle, entorno: EntornoNPuzzle, n: int) -> List[Dict]:
+    """Corre n ensayos desde el inicial del entorno; uno por elemento."""
+    res = []
+    for _ in range(n):
+        entorno.reiniciar()
+        desde = len(agente.latencias_ms)
+        entorno.run()
+        lat = resumen_latencias(agente.latencias_ms[desde:])
+        res.append({"movimientos": len(entorno.ruta) - 1, "llego": entorno.llego(),
+                    "estados_aprendidos": len(agente.h_aprendida),
+                    **{f"latencia_{k}_ms": v for k, v in lat.items()}})
+    return res
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Agente de tiempo real (LRTA*/RTA*) para el N-Puzzle.")
+    ap.add_argument("--N", type=int, default=3)
+    ap.add_argument("--tecnica", choices=["lrta", "rta"], default="lrta")
+    ap.add_argument("--heuristica", choices=["fuera", "manhattan", "conflicto"], default="manhattan")
+    ap.add_argument("--presupuesto_ms", type=float, default=10.0,
+                    help="Tiempo de planificación por movimiento.")
+    ap.add_argument("--ensayos", type=int, default=5)
+    ap.add_argument("--mezcla", type=int, default=40)
+    ap.add_argument("--semilla", type=int, default=7)
+    ap.add_argument("--max_movimientos", type=int, default=10_000,
+                    help="Corta un ensayo que no llega a la meta.")
+    args = ap.parse_args()
+
+    meta = Tablero(args.N, meta_estandar(args.N))
+    inicial = mezclar_aleatorio(args.N, pasos=args.mezcla, semilla=args.semilla)
+    agente = AgenteNPuzzle(args.N, HEURISTICAS[args.heuristica], args.tecnica,
+                           presupuesto_ms=args.presupuesto_ms)
+    agente.fijar_estados(inicial, meta)
+    entorno = EntornoNPuzzle(inicial, meta, args.max_movimientos)
+    entorno.insertar(agente)
+
+    print(f"{args.tecnica} | {args.heuristica} | presupuesto {args.presupuesto_ms} ms/movimiento")
+    for i, r in enumerate(ensayos(agente, entorno, args.ensayos), 1):
+        print(f"ensayo {i:3d} | movimientos={r['movimientos']:5d}"
+              + ("" if r["llego"] else " (sin llegar)")
+              + f" | latencia media={r['latencia_media_ms']:.2f} p99={r['latencia_p99_ms']:.2f} "
+                f"max={r['latencia_max_ms']:.2f} ms | h aprendidos={r['estados_aprendidos']}",
+              flush=True)
+
+if __name__ == "__main__":
+    main()